@@ -0,0 +1,77 @@
+import argparse
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+import joblib
+import sklearn
+
+# ======================
+# 세탁실 혼잡도 모델 아티팩트 (학습 결과 저장/로드)
+# ======================
+# 저장 형식이 바뀌면 올려서 이전 아티팩트를 무효화
+LAUNDRY_ARTIFACT_VERSION = 1
+LAUNDRY_MODEL_PATH = os.environ.get("LAUNDRY_MODEL_PATH", "data/artifacts/laundry")
+MODEL_FILE = "model.joblib"
+
+
+def save_laundry_model(path, model, meta):
+    """모델과 메타데이터를 임시 폴더에 쓴 뒤 rename으로 한 번에 교체합니다"""
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=".laundry-", dir=parent)
+    try:
+        joblib.dump(model, os.path.join(tmp, MODEL_FILE))
+        meta = dict(
+            meta,
+            version=LAUNDRY_ARTIFACT_VERSION,
+            sklearn_version=sklearn.__version__,
+            created_at=datetime.now().isoformat(),
+        )
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        os.rename(tmp, path)
+    except Exception:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return path
+
+
+def load_laundry_model(path, params):
+    """저장 형식 / sklearn 버전 / 시뮬레이션 파라미터가 모두 같으면 (모델, 메타데이터), 아니면 None"""
+    meta_path = os.path.join(path, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("version") != LAUNDRY_ARTIFACT_VERSION:
+        return None
+    if meta.get("sklearn_version") != sklearn.__version__:
+        print(f"⚠️ 세탁실 모델의 sklearn 버전({meta.get('sklearn_version')})이 달라 다시 학습합니다")
+        return None
+    if meta.get("params") != params:
+        print("⚠️ 세탁실 모델의 시뮬레이션 파라미터가 달라 다시 학습합니다")
+        return None
+    return joblib.load(os.path.join(path, MODEL_FILE)), meta
+
+
+# ======================
+# 오프라인 빌드
+# ======================
+if __name__ == "__main__":
+    from .simulate import train_artifact
+
+    parser = argparse.ArgumentParser(description="세탁실 혼잡도 모델을 학습해 아티팩트로 저장합니다")
+    parser.add_argument("--out", default=LAUNDRY_MODEL_PATH)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--replicas", type=int, default=None, help="주면 앙상블 시뮬레이션으로 학습")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    model, meta = train_artifact(replicas=args.replicas, seed=args.seed, workers=args.workers)
+    save_laundry_model(args.out, model, meta)
+    print(f"✅ 아티팩트 저장 완료: {args.out} (정확도 {meta['classification_report']['accuracy']:.3f})")
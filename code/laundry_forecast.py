@@ -0,0 +1,100 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from .simulate import WASHERS, CongestionForecast, get_model, label_congestion
+
+# ======================
+# 세탁실 혼잡도 예측 백엔드
+# ======================
+# "mlp"(시뮬레이션으로 학습한 MLP) / "empirical"(기록 CSV의 (요일, 시간)별 분포)
+LAUNDRY_FORECASTER = os.environ.get("LAUNDRY_FORECASTER", "mlp")
+LAUNDRY_CSV_PATH = os.environ.get("LAUNDRY_CSV_PATH", "data/laundry_simulation_31days.csv")
+CSV_CHUNK = 20000  # 행
+
+
+class EmpiricalForecast:
+    """분 단위 기록 CSV를 청크로 읽으며 (방, 요일, 시간)별 가동 세탁기 수 히스토그램을 쌓습니다.
+
+    히스토그램은 방별로 보관하지만(hists) 예측표는 모든 방을 합친 기숙사 전체 분포 하나입니다
+    (MLP 예측표와 같은 (요일, 시간) 모양). CongestionForecast와 같은 모양(classes / probabilities / predicted)에
+    기대 가동 대수(expected)를 더해 제공합니다.
+    """
+
+    def __init__(self, hists):
+        self.hists = hists  # room -> (7, 24, 가동 대수) 분 수
+        total = sum(hists.values())
+        values = np.arange(total.shape[-1])
+        labels = np.array([label_congestion(v) for v in values])
+        self.classes = sorted(set(labels.tolist()))
+
+        counts = total.sum(axis=-1, keepdims=True)
+        # 기록이 없는 칸은 등급을 고르게 둠
+        probabilities = np.stack([total[..., labels == c].sum(axis=-1) for c in self.classes], axis=-1)
+        self.probabilities = np.where(counts > 0, probabilities / np.maximum(counts, 1), 1.0 / len(self.classes))
+        self.predicted = np.asarray(self.classes)[self.probabilities.argmax(axis=2)]
+        self.expected = (total * values).sum(axis=-1) / np.maximum(counts[..., 0], 1)
+
+    @classmethod
+    def from_csv(cls, path=LAUNDRY_CSV_PATH, chunk_size=CSV_CHUNK):
+        hists = {}
+        columns = ["room", "day_of_week", "hour", "running_washers"]
+        for chunk in pd.read_csv(path, usecols=columns, chunksize=chunk_size):
+            running = chunk["running_washers"].to_numpy(dtype=np.int64)
+            n_bins = max(WASHERS, int(running.max(initial=0))) + 1
+            cell = (chunk["day_of_week"].to_numpy(dtype=np.int64) * 24 + chunk["hour"].to_numpy(dtype=np.int64)) * n_bins + running
+            for room, rows in chunk.groupby("room").indices.items():
+                counts = np.bincount(cell[rows], minlength=7 * 24 * n_bins).reshape(7, 24, n_bins)
+                hists[room] = add_histograms(hists.get(room), counts)
+        if not hists:
+            raise ValueError(f"세탁실 기록이 비어 있습니다: {path}")
+        n_bins = max(h.shape[-1] for h in hists.values())
+        return cls({room: pad_histogram(h, n_bins) for room, h in hists.items()})
+
+
+def pad_histogram(hist, n_bins):
+    if hist.shape[-1] == n_bins:
+        return hist
+    return np.concatenate([hist, np.zeros(hist.shape[:-1] + (n_bins - hist.shape[-1],), dtype=hist.dtype)], axis=-1)
+
+
+def add_histograms(a, b):
+    """가동 대수 칸 수가 다른 히스토그램끼리 더합니다"""
+    if a is None:
+        return b
+    n_bins = max(a.shape[-1], b.shape[-1])
+    return pad_histogram(a, n_bins) + pad_histogram(b, n_bins)
+
+
+def load_forecast(backend=None):
+    """설정된 백엔드로 요일×시간 예측표를 만듭니다. empirical인데 CSV가 없으면 조용히 MLP로 바꾸지 않고 실패합니다"""
+    backend = backend or LAUNDRY_FORECASTER
+    if backend == "empirical":
+        if not os.path.exists(LAUNDRY_CSV_PATH):
+            raise FileNotFoundError(f"세탁실 기록 CSV가 없습니다 (LAUNDRY_FORECASTER=empirical): {LAUNDRY_CSV_PATH}")
+        start = time.perf_counter()
+        forecast = EmpiricalForecast.from_csv(LAUNDRY_CSV_PATH)
+        print(f"✅ 세탁실 기록 분포 학습 완료 ({time.perf_counter() - start:.2f}초)")
+        return forecast
+    if backend != "mlp":
+        raise ValueError(f"알 수 없는 세탁실 예측 방식: {backend} (가능: mlp, empirical)")
+    return CongestionForecast(get_model())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="세탁실 혼잡도 예측표 (요일 × 시간) 출력")
+    parser.add_argument("--backend", choices=["mlp", "empirical"], default=LAUNDRY_FORECASTER)
+    parser.add_argument("--day", type=int, default=1, help="요일 (0=월)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    forecast = load_forecast(args.backend)
+    print(f"▶ {args.backend} 예측표 준비 ({time.perf_counter() - start:.2f}초)")
+    table = pd.DataFrame(forecast.probabilities[args.day], columns=[f"p_{c}" for c in forecast.classes]).round(3)
+    table.insert(0, "predicted", forecast.predicted[args.day])
+    if hasattr(forecast, "expected"):
+        table.insert(1, "expected", forecast.expected[args.day].round(2))
+    print(table.to_string())
@@ -0,0 +1,287 @@
+import argparse
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+from .simulate import DRYERS, ROOMS, WASHERS, label_congestion
+
+# ======================
+# 실시간 세탁기 이벤트 반영
+# ======================
+LIVE_RING_HOURS = 24 * 7 * 2  # 시간별 가동 기록을 보관하는 링 버퍼 칸 수 (2주)
+LIVE_DECAY = 0.5  # 같은 (요일, 시간) 칸에 새 관측이 들어올 때 이전 관측에 곱하는 가중치
+LIVE_PRIOR_MINUTES = 120  # 기존 예측표를 관측 몇 분어치로 볼지 (관측이 쌓일수록 관측 쪽으로 기움)
+LIVE_CARRY_MINUTES = 60  # 마지막 이벤트 뒤 이만큼만 가동 대수가 그대로라고 보고 기록 (그 뒤는 관측 없음)
+LIVE_MAX_SKEW_MINUTES = 5  # 서버 시각보다 이만큼 넘게 앞선 이벤트는 거절
+# 예측표의 (요일, 시간)은 기숙사 현지 시각 기준. 서버(컨테이너) 시간대와 관계없이 이 시간대로 맞춤
+LAUNDRY_TZ = ZoneInfo(os.environ.get("LAUNDRY_TZ", "Asia/Seoul"))
+MACHINES = {"washer": WASHERS, "dryer": DRYERS}
+EVENTS = ("start", "finish")
+REPLAY_BATCH = 500
+EPOCH = datetime(1970, 1, 1)
+
+
+def minute_of(timestamp):
+    """datetime -> LAUNDRY_TZ 현지 시각 기준 분 번호 (naive 시각은 LAUNDRY_TZ 시각으로 봄)"""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(LAUNDRY_TZ).replace(tzinfo=None)
+    return int((timestamp - EPOCH).total_seconds() // 60)
+
+
+def time_of(minute):
+    """minute_of의 역: 분 번호 -> LAUNDRY_TZ 현지 시각 (naive)"""
+    return EPOCH + timedelta(minutes=int(minute))
+
+
+def now_minute():
+    return minute_of(datetime.now(LAUNDRY_TZ))
+
+
+class LiveOccupancy:
+    """방별 세탁기/건조기 시작·종료 이벤트로 가동 대수를 따라가며, 시간마다 분 단위 가동 세탁기 수 히스토그램을
+    고정 크기 링 버퍼에 기록합니다.
+
+    마지막 이벤트 뒤 LIVE_CARRY_MINUTES분까지만 가동 대수를 이어서 기록하므로, 피드가 끊기거나 서버가 재시작돼도
+    마지막 상태가 빈 시간들을 관측처럼 채우지 않습니다.
+    이벤트가 하나라도 들어온 시간이 끝날 때마다 그 시간의 히스토그램을 (요일, 시간) 칸에 지수 감쇠로 더하고,
+    blend()는 기존 예측표를 LIVE_PRIOR_MINUTES분어치 관측으로 보고 관측과 섞은 예측표를 만듭니다.
+    """
+
+    def __init__(self, rooms=ROOMS, ring_hours=LIVE_RING_HOURS, decay=LIVE_DECAY, prior_minutes=LIVE_PRIOR_MINUTES,
+                 carry_minutes=LIVE_CARRY_MINUTES):
+        self.ring_hours = ring_hours
+        self.carry_minutes = carry_minutes
+        self.rooms = list(rooms)
+        self.room_index = {room: i for i, room in enumerate(self.rooms)}
+        self.decay = decay
+        self.prior_minutes = prior_minutes
+        # 링 버퍼: 칸마다 (절대 시간 번호, 방별 가동 대수별 분 수, 방별 건조기 가동 분 수, 이벤트 수)
+        self.ring_hour = np.full(ring_hours, -1, dtype=np.int64)
+        self.ring_events = np.zeros(ring_hours, dtype=np.int64)
+        self.ring_washers = np.zeros((ring_hours, len(self.rooms), WASHERS + 1), dtype=np.int64)
+        self.ring_dryer_minutes = np.zeros((ring_hours, len(self.rooms)), dtype=np.int64)
+        # (요일, 시간)별 감쇠 누적 히스토그램 (방 합산)
+        self.cells = np.zeros((7, 24, WASHERS + 1), dtype=np.float64)
+        self.running = {name: np.zeros(len(self.rooms), dtype=np.int64) for name in MACHINES}
+        self.clock = None  # 지금까지 반영한 시각 (분)
+        self.last_event = None  # 마지막 이벤트를 반영한 시각 (분)
+        self.events = 0
+        self.closed_hours = 0
+        self.lock = threading.Lock()
+
+    def ingest(self, events):
+        """이벤트 목록 [(room, machine, event, 분)]을 시간순으로 반영하고, 이번에 마감된 시간 수를 반환합니다"""
+        closed = 0
+        with self.lock:
+            for room, machine, event, minute in sorted(events, key=lambda e: e[3]):
+                if self.clock is None:
+                    self.clock = minute
+                closed += self.advance(minute)
+                count = self.running[machine]
+                r = self.room_index[room]
+                delta = 1 if event == "start" else -1
+                count[r] = min(MACHINES[machine], max(0, count[r] + delta))
+                self.ring_events[self.slot(self.clock // 60)] += 1
+                self.last_event = self.clock
+                self.events += 1
+        return closed
+
+    def advance(self, minute):
+        """clock부터 minute까지 현재 가동 대수를 기록하고, 반영된 시간 수를 반환합니다 (늦게 온 이벤트는 현재 시각에 반영)"""
+        closed = 0
+        observed_until = self.clock if self.last_event is None else self.last_event + self.carry_minutes
+        while self.clock < minute:
+            if self.clock >= observed_until and self.clock % 60 == 0:
+                # 관측이 끊긴 뒤의 빈 시간들은 기록도 마감도 하지 않고 건너뜀
+                self.clock = minute
+                break
+            hour_id = self.clock // 60
+            end = min(minute, (hour_id + 1) * 60)
+            span = min(end, observed_until) - self.clock
+            if span > 0:
+                slot = self.slot(hour_id)
+                rows = np.arange(len(self.rooms))
+                self.ring_washers[slot, rows, self.running["washer"]] += span
+                self.ring_dryer_minutes[slot] += span * self.running["dryer"]
+            self.clock = end
+            if end == (hour_id + 1) * 60:
+                closed += self.close_hour(hour_id)
+        return closed
+
+    def slot(self, hour_id):
+        slot = hour_id % len(self.ring_hour)
+        if self.ring_hour[slot] != hour_id:
+            self.ring_hour[slot] = hour_id
+            self.ring_washers[slot] = 0
+            self.ring_dryer_minutes[slot] = 0
+            self.ring_events[slot] = 0
+        return slot
+
+    def close_hour(self, hour_id):
+        """이벤트가 들어온 시간만 (요일, 시간) 칸에 더합니다. 더했으면 1"""
+        slot = hour_id % len(self.ring_hour)
+        if self.ring_hour[slot] != hour_id or self.ring_events[slot] == 0:
+            return 0
+        start = time_of(hour_id * 60)
+        cell = self.cells[start.weekday(), start.hour]
+        cell *= self.decay
+        cell += self.ring_washers[slot].sum(axis=0)
+        self.closed_hours += 1
+        return 1
+
+    def blend(self, base):
+        """기존 예측표(classes / probabilities / predicted, 있으면 expected)에 관측을 섞은 예측표"""
+        with self.lock:
+            cells = self.cells.copy()
+        return BlendedForecast(base, cells, self.prior_minutes)
+
+    def status(self, hours=24):
+        """방별 현재 가동 대수와 최근 hours시간(최대 링 버퍼 크기)의 시간별 평균 가동 세탁기/건조기 수"""
+        hours = max(1, min(int(hours), self.ring_hours))
+        with self.lock:
+            recent = []
+            if self.clock is not None:
+                current = self.clock // 60
+                for hour_id in range(current - hours + 1, current + 1):
+                    slot = hour_id % len(self.ring_hour)
+                    if self.ring_hour[slot] != hour_id:
+                        continue
+                    minutes = self.ring_washers[slot].sum(axis=1)
+                    washers = (self.ring_washers[slot] * np.arange(WASHERS + 1)).sum(axis=1) / np.maximum(minutes, 1)
+                    dryers = self.ring_dryer_minutes[slot] / np.maximum(minutes, 1)
+                    recent.append({
+                        "hour": time_of(hour_id * 60).isoformat(),
+                        "mean_running_washers": {room: round(float(washers[i]), 2) for i, room in enumerate(self.rooms)},
+                        "mean_running_dryers": {room: round(float(dryers[i]), 2) for i, room in enumerate(self.rooms)},
+                    })
+            return {
+                "events": self.events,
+                "closed_hours": self.closed_hours,
+                "clock": time_of(self.clock).isoformat() if self.clock is not None else None,
+                "running": {
+                    room: {name: int(count[i]) for name, count in self.running.items()}
+                    for i, room in enumerate(self.rooms)
+                },
+                "recent": recent,
+            }
+
+
+class BlendedForecast:
+    """기존 예측표를 prior_minutes분어치 관측으로 보고 (요일, 시간)별 관측 히스토그램과 섞습니다"""
+
+    def __init__(self, base, cells, prior_minutes):
+        values = np.arange(cells.shape[-1])
+        labels = np.array([label_congestion(v) for v in values])
+        self.classes = list(base.classes)
+        observed = np.stack([cells[..., labels == c].sum(axis=-1) for c in self.classes], axis=-1)
+        minutes = cells.sum(axis=-1, keepdims=True)
+        self.probabilities = (base.probabilities * prior_minutes + observed) / (prior_minutes + minutes)
+        self.predicted = np.asarray(self.classes)[self.probabilities.argmax(axis=2)]
+        self.observed_minutes = minutes[..., 0]
+        if getattr(base, "expected", None) is not None:
+            self.expected = (base.expected * prior_minutes + (cells * values).sum(axis=-1)) / (prior_minutes + minutes[..., 0])
+
+
+# ======================
+# 기록 CSV -> 이벤트 스트림 (테스트용 재생)
+# ======================
+def replay_start(path):
+    """기록이 지금 끝나도록 CSV 0일차(월요일)를 맞춘 날짜: 지금 - 기록 일수 이전의 가장 가까운 월요일 자정"""
+    days = int(pd.read_csv(path, usecols=["minute"])["minute"].max()) // (24 * 60) + 1
+    start = (datetime.now(LAUNDRY_TZ).replace(tzinfo=None) - timedelta(days=days)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return start - timedelta(days=start.weekday())
+
+
+def csv_events(path, start=None):
+    """분 단위 기록 CSV의 가동 대수 변화를 시작/종료 이벤트로 바꿔 시간순으로 냅니다: (room, machine, event, datetime)
+
+    start(CSV 0일차, LAUNDRY_TZ 현지 시각)가 없으면 replay_start()를 씁니다.
+    """
+    df = pd.read_csv(path, usecols=["minute", "room", "running_washers", "running_dryers"])
+    base = datetime.fromisoformat(start) if start else replay_start(path)
+    frames = []
+    for machine, column in (("washer", "running_washers"), ("dryer", "running_dryers")):
+        diff = df.groupby("room")[column].diff().fillna(df[column]).astype(np.int64)
+        changed = diff != 0
+        frames.append(pd.DataFrame({
+            "minute": df["minute"][changed],
+            "room": df["room"][changed],
+            "machine": machine,
+            "delta": diff[changed],
+        }))
+    events = pd.concat(frames).sort_values("minute", kind="stable")
+    for minute, room, machine, delta in events.itertuples(index=False):
+        timestamp = base + timedelta(minutes=int(minute))
+        for _ in range(abs(int(delta))):
+            yield room, machine, "start" if delta > 0 else "finish", timestamp
+
+
+def replay_http(path, url, start=None, batch=REPLAY_BATCH):
+    """서버는 링 버퍼보다 오래된 이벤트를 거절하므로 최근 LIVE_RING_HOURS시간 분량만 보냅니다.
+
+    그 이전 이벤트는 보내지 않고, 창 시작 시각에 가동 중이던 대수만큼 start 이벤트로 모아 보냅니다.
+    """
+    import requests
+
+    # 전송 중에 창 밖으로 밀려나지 않도록 한 시간 여유
+    since = now_minute() - (LIVE_RING_HOURS - 1) * 60
+    running = {}
+    sent, buffer = 0, []
+    for room, machine, event, timestamp in csv_events(path, start):
+        if minute_of(timestamp) < since:
+            running[room, machine] = running.get((room, machine), 0) + (1 if event == "start" else -1)
+            continue
+        if running:
+            opened = time_of(since).isoformat()
+            for (r, m), count in running.items():
+                buffer.extend({"room": r, "machine": m, "event": "start", "timestamp": opened} for _ in range(max(0, count)))
+            running = {}
+        buffer.append({"room": room, "machine": machine, "event": event, "timestamp": timestamp.isoformat()})
+        if len(buffer) >= batch:
+            requests.post(f"{url}/laundry/events", json=buffer, timeout=30).raise_for_status()
+            sent += len(buffer)
+            buffer = []
+    if buffer:
+        requests.post(f"{url}/laundry/events", json=buffer, timeout=30).raise_for_status()
+        sent += len(buffer)
+    return sent
+
+
+if __name__ == "__main__":
+    from .laundry_forecast import LAUNDRY_CSV_PATH, load_forecast
+
+    parser = argparse.ArgumentParser(description="세탁실 기록 CSV를 이벤트 스트림으로 재생합니다")
+    parser.add_argument("--csv", default=LAUNDRY_CSV_PATH)
+    parser.add_argument("--start", default=None, help="CSV 0일차에 대응하는 날짜 (월요일, 기본: 기록이 지금 끝나도록 맞춤)")
+    parser.add_argument("--url", default=None, help="서버 주소 (예: http://localhost:8002). 없으면 로컬에서 반영 결과만 출력")
+    parser.add_argument("--backend", default=None, help="로컬 재생 시 기준 예측표 (mlp / empirical)")
+    parser.add_argument("--day", type=int, default=1, help="출력할 요일 (0=월)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.url:
+        sent = replay_http(args.csv, args.url, args.start)
+        print(f"✅ 이벤트 {sent}개 전송 ({time.perf_counter() - start:.1f}초)")
+        raise SystemExit(0)
+
+    base = load_forecast(args.backend)
+    live = LiveOccupancy()
+    live.ingest((room, machine, event, minute_of(ts)) for room, machine, event, ts in csv_events(args.csv, args.start))
+    blended = live.blend(base)
+    print(f"✅ 이벤트 {live.events}개 / {live.closed_hours}시간 반영 ({time.perf_counter() - start:.1f}초)")
+    table = pd.DataFrame({
+        "base": base.predicted[args.day],
+        "live": blended.predicted[args.day],
+        "observed_minutes": blended.observed_minutes[args.day].round(1),
+    })
+    if hasattr(blended, "expected"):
+        table["base_expected"] = base.expected[args.day].round(2)
+        table["live_expected"] = blended.expected[args.day].round(2)
+    print(table.to_string())
+    print(json.dumps(live.status(hours=3), ensure_ascii=False, indent=2))
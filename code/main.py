@@ -1,16 +1,28 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from datetime import datetime
 import requests
-from .simulate import predict_day, get_model
+from .laundry_forecast import load_forecast
+from .laundry_live import EVENTS, LIVE_MAX_SKEW_MINUTES, LIVE_RING_HOURS, MACHINES, LiveOccupancy, minute_of, now_minute
+from .match_index import build_gender_indexes, mutual_constraint, top_k, top_k_rows, trait_masks, GenderIndex, ProfilePacker, ProfileTable, RankedList, RankedListCache, UserTable, TRAITS
+from .match_artifacts import ARTIFACT_DIR, artifact_key, load_artifact, save_artifact
+from .match_search import GRAPH_MARGIN, ClusterGraph, make_search
+from .match_assign import ASSIGN_K, OBJECTIVES, AssignmentJobs, JobQueueFull, solve_assignment
+from .user_store import USER_STORE_PATH, data_signature, is_user_store, read_users, refresh_user_store
+from .model_loader import BackgroundLoader
+from .match_registry import EngineRegistry
+from .match_reload import PoolReloader
+from .match_clusters import fixed_k_metrics, select_k
 import pandas as pd
 import numpy as np
 from sklearn.cluster import KMeans
-from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.preprocessing import MinMaxScaler
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import os
+import re
+import threading
 
 # ======================
 # 매칭 모델 설정
@@ -26,14 +38,66 @@ weight_A = {
     "social_willingness": W_P, "friend_invite": W_P, "dorm_stay": W_P, "space_privacy": W_P
 }
 
+# 추천 목록 캐시: 한 번 정렬할 때 최소 RANK_DEPTH명까지 순위를 매겨 다음 페이지를 재사용
+RANK_DEPTH = 100
+RANK_CACHE_SIZE = 2048
+RANK_CACHE_TTL = 300  # 초
+
+# 일괄 추천 시 한 번의 행렬곱에 넣을 최대 타겟 수 (메모리: 타겟 수 × 후보 수 float32)
+BATCH_CHUNK = 256
+
+# 결과 카드에 함께 내려주는 유저 정보 컬럼
+RESULT_COLUMNS = ["student_id", "major", "is_smoker", "is_drinker", "sensitive_heat", "sensitive_cold"]
+TEXT_COLUMNS = ["student_id", "gender", "major"]
+# 흡연/음주 조건 필터(strict)에 쓰는 컬럼
+USER_COLUMNS = list(dict.fromkeys(TEXT_COLUMNS + RESULT_COLUMNS + list(TRAITS)))
+
+# 후보 검색 방식: "cluster"(같은 클러스터, 부족하면 같은 성별 전체) / "ivf"(가까운 클러스터 MATCH_NPROBE개부터) / "full"(정확)
+MATCH_SEARCH = os.environ.get("MATCH_SEARCH", "cluster")
+MATCH_NPROBE = int(os.environ.get("MATCH_NPROBE", "2"))
+# cluster 검색에서 후보가 부족할 때 같은 성별 전체 대신 중심점 근접 그래프로 넓히려면 차수(예: 3)를 지정.
+# 그래프는 유사도를 보지 않고 후보 수만으로 멈추는 근사라 recall이 떨어지므로 기본은 꺼 둠 (0)
+MATCH_GRAPH_DEGREE = int(os.environ.get("MATCH_GRAPH_DEGREE", "0"))
+MATCH_GRAPH_MARGIN = float(os.environ.get("MATCH_GRAPH_MARGIN", str(GRAPH_MARGIN)))
+
+# 후보 채점 방식: "packed"(uint32 비트 패킹 + popcount) / "float"(float32 가중 벡터 행렬)
+MATCH_SCORING = os.environ.get("MATCH_SCORING", "packed")
+
+# 클러스터 개수: 숫자(고정) 또는 "auto"(K 후보를 병렬 학습해 inertia 엘보 + 최대 클러스터 비율로 선택, match_clusters.py)
+MATCH_CLUSTERS = os.environ.get("MATCH_CLUSTERS", "12")
+
+# 응답 조합 수가 이 값 이하이면 전체 프로필 공간을 미리 계산 (기본 설문: 2^15 × 4 = 131,072)
+PROFILE_TABLE_MAX = 1 << 20
+
+# 온라인 추가/삭제로 중심점이 이동한 정도 (중심점 간 평균 거리 대비)가 이 값을 넘으면 백그라운드 재클러스터링
+RECLUSTER_DRIFT = 0.2
+
 class DormMatchAI_Server:
-    def __init__(self, data_path):
+    def __init__(self, data_path, n_clusters=None, cluster_metrics=False):
         self.data_path = data_path
-        self.users_df = None
-        self.weighted_features_df = None
+        self.data_signature = None
+        self.n_clusters = str(n_clusters or MATCH_CLUSTERS)
+        self.cluster_metrics = cluster_metrics  # 고정 K로 학습할 때도 샘플 실루엣을 계산할지 (O(샘플²))
+        self.gender_index = {}
+        self.rank_cache = RankedListCache(maxsize=RANK_CACHE_SIZE, ttl=RANK_CACHE_TTL)
         self.weights = weight_A
         self.scaler = MinMaxScaler()
-        self.kmeans = KMeans(n_clusters=12, random_state=42)
+        self.cluster_selection = None
+        self.centroids = None
+        self.centroid_counts = None
+        self.fit_centroids = None
+        self.centroid_spacing = 1.0
+        self.cluster_graph = None
+        self.artifact_key = None
+        self.users = None
+        self.profile_table = None
+        self.packer = None
+        self.search = make_search(MATCH_SEARCH, nprobe=MATCH_NPROBE)
+        self.lock = threading.RLock()
+        self.recluster_thread = None
+        self.recluster_state = "idle"  # idle / running / ready / failed
+        self.recluster_error = None
+        self.recluster_finished_at = None
         
         self.text_map = {
             "sleep_habit": {0: "12시전 취침", 1: "새벽 취침"},
@@ -75,33 +139,221 @@ class DormMatchAI_Server:
         }
         
         self.feature_cols = list(self.weights.keys())
+        self.build_label_tables()
     
-    def load_and_train(self):
-        print("⏳ 데이터 로딩 및 모델 학습 시작...")
-        with open(self.data_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+    def build_label_tables(self):
+        """설명 문구를 배열 인덱싱으로 찾도록 항목명/값 라벨 테이블을 미리 만듭니다"""
+        self.n_values = 1 + max(
+            max((k for k in self.text_map.get(col, {}) if isinstance(k, int)), default=1)
+            for col in self.feature_cols
+        )
+        self.col_labels = np.array([self.col_name_map.get(col, col) for col in self.feature_cols], dtype=object)
+        self.value_labels = np.empty((len(self.feature_cols), self.n_values), dtype=object)
+        for i, col in enumerate(self.feature_cols):
+            for v in range(self.n_values):
+                self.value_labels[i, v] = self.text_map.get(col, {}).get(v, str(v))
+    
+    def build_user_table(self, data, features, weighted_data, labels):
+        """읽어 온 컬럼 dict와 설문 응답 DataFrame으로 UserTable을 만듭니다 (유저 데이터는 UserTable 하나만 보관)"""
+        n = len(features)
+        columns = {}
+        for col in USER_COLUMNS:
+            if col in TEXT_COLUMNS:
+                columns[col] = np.array(data[col], dtype=object) if col in data else np.full(n, "", dtype=object)
+            else:
+                columns[col] = np.array(data[col], dtype=bool) if col in data else np.zeros(n, dtype=bool)
+        columns["profile"] = features.to_numpy(dtype=np.int16)
+        # 아티팩트의 읽기 전용 memmap을 그대로 쓰지 않도록 복사본으로 보관 (재클러스터링이 제자리에서 덮어씀)
+        columns["weighted"] = np.array(weighted_data, dtype=np.float32, copy=True)
+        columns["cluster_id"] = np.array(labels, dtype=np.int32, copy=True)
+        self.users = UserTable(columns)
+    
+    def build_indexes(self):
+        """UserTable의 살아있는 유저로 성별 인덱스를 다시 만듭니다"""
+        alive = np.flatnonzero(self.users['alive'])
+        items = self.users['weighted'][alive]
+        if self.packer is not None:
+            words = self.packer.pack(self.users['profile'][alive])
+            if (words < 0).any():
+                print("⚠️ 범위를 벗어난 응답 값이 있어 비트 패킹 대신 float 벡터로 채점합니다")
+                self.packer = None
+            else:
+                items = words
+        self.gender_index = build_gender_indexes(
+            self.users['gender'][alive], self.users['student_id'][alive],
+            items, self.users['cluster_id'][alive], alive, self.packer,
+            trait_masks({name: self.users[name][alive] for name in TRAITS})
+        )
+        self.rank_cache.clear()
+    
+    def set_centroids(self, centroids, labels):
+        self.centroids = np.array(centroids, dtype=np.float64)
+        self.fit_centroids = self.centroids.copy()
+        self.centroid_counts = np.bincount(labels, minlength=len(self.centroids)).astype(np.float64)
+        if len(self.centroids) > 1:
+            dists = np.linalg.norm(self.centroids[:, None, :] - self.centroids[None, :, :], axis=2)
+            np.fill_diagonal(dists, np.inf)
+            self.centroid_spacing = float(dists.min(axis=1).mean()) or 1.0
+        self.cluster_graph = self.build_cluster_graph(MATCH_GRAPH_DEGREE, MATCH_GRAPH_MARGIN)
+        if self.profile_table is not None:
+            self.profile_table.assign_clusters(self.assign_clusters)
+    
+    def build_cluster_graph(self, degree, margin):
+        """degree가 0이면 None (cluster 검색이 같은 성별 전체로 넓히는 기존 방식)"""
+        if degree <= 0:
+            return None
+        return ClusterGraph(self.centroids, degree, margin)
+    
+    def build_profile_table(self):
+        """설문 응답은 모두 이산값이므로 가능한 프로필 전체를 미리 벡터화해 둡니다"""
+        domain_sizes = [len([k for k in self.text_map.get(col, {0: 0, 1: 1}) if isinstance(k, int)]) for col in self.feature_cols]
+        weights = np.array([self.weights[col] for col in self.feature_cols], dtype=np.float64)
         
+        self.packer = None
+        if MATCH_SCORING == "packed":
+            try:
+                self.packer = ProfilePacker(domain_sizes, self.scaler.scale_, self.scaler.min_, weights)
+            except ValueError as e:
+                print(f"⚠️ 비트 패킹 불가 - float 벡터로 채점합니다: {e}")
+        
+        if int(np.prod(domain_sizes)) > PROFILE_TABLE_MAX:
+            self.profile_table = None
+            return
+        self.profile_table = ProfileTable(domain_sizes, self.scaler.scale_, self.scaler.min_, weights)
+    
+    def load_and_train(self, artifact_dir=None, force_train=False):
+        """데이터를 로드하고 모델을 준비합니다. artifact_dir에 같은 데이터/가중치로 학습된 결과가 있으면 학습을 건너뜁니다"""
+        print("⏳ 데이터 로딩 및 모델 학습 시작...")
         required_fields = ['student_id', 'gender'] + self.feature_cols
-        valid_data = [record for record in data if all(field in record for field in required_fields)]
+        # 저장소를 만든 원본 JSON이 그 뒤에 바뀌었으면 저장소부터 다시 만듦
+        if is_user_store(self.data_path):
+            refresh_user_store(self.data_path, required_fields)
+        # 읽기 전에 서명을 떠 두어 읽는 도중 파일이 바뀌면 다음 감시 주기에 다시 로드되게 함
+        self.data_signature = data_signature(self.data_path)
+        columns, n_total, n_valid = read_users(self.data_path, required_fields)
         
-        print(f"✅ 전체 {len(data)}개 중 유효한 데이터 {len(valid_data)}개 로드")
+        print(f"✅ 전체 {n_total}개 중 유효한 데이터 {n_valid}개 로드")
         
-        if len(valid_data) == 0:
+        if n_valid == 0:
             raise ValueError("유효한 데이터가 없습니다.")
         
-        self.users_df = pd.DataFrame(valid_data)
-        features_norm = self.scaler.fit_transform(self.users_df[self.feature_cols])
+        # 스케일러 학습/프로필 컬럼용 설문 응답 (엔진에는 UserTable만 남김)
+        features = pd.DataFrame({col: columns[col] for col in self.feature_cols})
         
-        weighted_data = features_norm.copy()
-        for i, col in enumerate(self.feature_cols):
-            weighted_data[:, i] *= self.weights[col]
+        artifact = None
+        if artifact_dir is not None:
+            self.artifact_key = artifact_key(self.data_path, self.weights, self.n_clusters)
+            if not force_train:
+                artifact = load_artifact(artifact_dir, self.artifact_key)
+        
+        if artifact is not None:
+            meta, arrays = artifact
+            self.restore_scaler(arrays)
+            weighted_data = arrays['weighted']
+            labels = np.asarray(arrays['labels'])
+            centroids = arrays['centroids']
+            self.cluster_selection = meta.get('cluster_selection')
+            print(f"✅ 저장된 모델 사용 ({meta['created_at']}) - 학습 생략")
+        else:
+            features_norm = self.scaler.fit_transform(features)
+            
+            weighted_data = features_norm.copy()
+            for i, col in enumerate(self.feature_cols):
+                weighted_data[:, i] *= self.weights[col]
+            
+            labels, centroids = self.fit_clusters(weighted_data)
+            print(f"✅ 모델 학습 완료! (K={len(centroids)}, {self.cluster_selection['method']})")
+            if artifact_dir is not None:
+                save_artifact(artifact_dir, self.artifact_key, {
+                    "weighted": weighted_data.astype(np.float32),
+                    "labels": labels.astype(np.int32),
+                    "centroids": centroids,
+                    "scaler_min": self.scaler.min_,
+                    "scaler_scale": self.scaler.scale_,
+                    "data_min": self.scaler.data_min_,
+                    "data_max": self.scaler.data_max_,
+                }, {
+                    "data_path": self.data_path,
+                    "n_users": len(features),
+                    "n_clusters": int(len(centroids)),
+                    "cluster_selection": self.cluster_selection,
+                    "feature_cols": self.feature_cols,
+                    "weights": self.weights,
+                })
+        
+        with self.lock:
+            self.build_profile_table()
+            self.set_centroids(centroids, labels)
+            self.build_user_table(columns, features, weighted_data, labels)
+            self.build_indexes()
+        print("✅ 매칭 모델 준비 완료!")
+    
+    def fit_clusters(self, weighted_data):
+        """n_clusters가 숫자면 그 K로, "auto"면 select_k가 고른 K(inertia 엘보 + 최대 클러스터 비율)로 학습합니다"""
+        if self.n_clusters == "auto":
+            centroids, self.cluster_selection = select_k(weighted_data)
+            self.centroids = centroids
+            return self.assign_clusters(weighted_data), centroids
         
-        self.weighted_features_df = pd.DataFrame(weighted_data, columns=self.feature_cols, index=self.users_df.index)
-        self.users_df['cluster_id'] = self.kmeans.fit_predict(self.weighted_features_df)
-        print("✅ 모델 학습 완료!")
+        kmeans = KMeans(n_clusters=int(self.n_clusters), random_state=42)
+        labels = kmeans.fit_predict(pd.DataFrame(weighted_data, columns=self.feature_cols))
+        if self.cluster_metrics:
+            self.cluster_selection = fixed_k_metrics(weighted_data, labels, kmeans.inertia_)
+        else:
+            self.cluster_selection = {"method": "fixed", "k": int(self.n_clusters), "inertia": round(float(kmeans.inertia_), 4)}
+        return labels, kmeans.cluster_centers_
+    
+    def restore_scaler(self, arrays):
+        self.scaler.min_ = np.asarray(arrays['scaler_min'])
+        self.scaler.scale_ = np.asarray(arrays['scaler_scale'])
+        self.scaler.data_min_ = np.asarray(arrays['data_min'])
+        self.scaler.data_max_ = np.asarray(arrays['data_max'])
+        self.scaler.data_range_ = self.scaler.data_max_ - self.scaler.data_min_
+        self.scaler.n_features_in_ = len(self.feature_cols)
+        self.scaler.feature_names_in_ = np.array(self.feature_cols, dtype=object)
+        self.scaler.n_samples_seen_ = len(arrays['weighted'])
+    
+    def assign_clusters(self, weighted_vecs, chunk_size=16384):
+        """가장 가까운 중심점의 클러스터 번호 (KMeans.predict와 동일)"""
+        vecs = np.asarray(weighted_vecs, dtype=np.float64)
+        labels = np.empty(len(vecs), dtype=np.int64)
+        for start in range(0, len(vecs), chunk_size):
+            chunk = vecs[start:start + chunk_size]
+            dists = ((chunk[:, None, :] - self.centroids[None, :, :]) ** 2).sum(axis=2)
+            labels[start:start + chunk_size] = dists.argmin(axis=1)
+        return labels
+    
+    def vectorize(self, users: list):
+        """유저 목록 -> (가중 벡터 float32, 클러스터 번호, 패킹 코드). 프로필 테이블 조회로 처리하고 범위 밖 값만 스케일러를 거칩니다"""
+        vecs = np.empty((len(users), len(self.feature_cols)), dtype=np.float32)
+        clusters = np.empty(len(users), dtype=np.int64)
+        
+        values = np.array([[user[col] for col in self.feature_cols] for user in users], dtype=np.int64)
+        words = self.packer.pack(values) if self.packer is not None else np.full(len(users), -1, dtype=np.int64)
+        codes = np.full(len(users), -1, dtype=np.int64)
+        if self.profile_table is not None:
+            codes = self.profile_table.encode(values)
+        
+        hit = np.flatnonzero(codes >= 0)
+        if len(hit):
+            vecs[hit] = self.profile_table.vectors[codes[hit]]
+            if self.profile_table.clusters is not None:
+                clusters[hit] = self.profile_table.clusters[codes[hit]]
+            else:
+                clusters[hit] = self.assign_clusters(vecs[hit])
+        
+        miss = np.flatnonzero(codes < 0)
+        if len(miss):
+            weighted = self.preprocess_inputs([users[i] for i in miss]).to_numpy()
+            vecs[miss] = weighted
+            clusters[miss] = self.assign_clusters(weighted)
+        return vecs, clusters, words
     
     def preprocess_input(self, user_data: dict):
-        input_df = pd.DataFrame([user_data])
+        return self.preprocess_inputs([user_data])
+    
+    def preprocess_inputs(self, users: list):
+        input_df = pd.DataFrame(users)
         norm_data = self.scaler.transform(input_df[self.feature_cols])
         
         weighted_input = norm_data.copy()
@@ -110,76 +362,361 @@ class DormMatchAI_Server:
         
         return pd.DataFrame(weighted_input, columns=self.feature_cols)
     
-    def explain_match_detail(self, user_data: dict, partner_row: pd.Series):
-        match_items = []
-        mismatch_items = []
+    def label_of(self, col_idx, value):
+        if 0 <= value < self.n_values:
+            return self.value_labels[col_idx, value]
+        return str(value)
+    
+    def explain_match_detail(self, user_data: dict, partner_profiles: np.ndarray):
+        """추천된 상대들(행) 전체의 일치/불일치 항목을 한 번의 비교로 계산합니다"""
+        my_values = np.array([user_data[col] for col in self.feature_cols], dtype=np.int64)
+        partner_profiles = np.asarray(partner_profiles, dtype=np.int64).reshape(-1, len(self.feature_cols))
+        equal = partner_profiles == my_values
         
-        for col in self.feature_cols:
-            val_me = user_data[col]
-            val_partner = partner_row[col]
-            col_name_kr = self.col_name_map.get(col, col)
-            
-            if val_me == val_partner:
-                match_items.append(col_name_kr)
-            else:
-                my_val_txt = self.text_map.get(col, {}).get(val_me, str(val_me))
-                pt_val_txt = self.text_map.get(col, {}).get(val_partner, str(val_partner))
-                mismatch_items.append({
-                    "category": col_name_kr,
-                    "my_value": my_val_txt,
-                    "mate_value": pt_val_txt
-                })
+        # 나의 값은 고정이므로 (항목, 상대 값)별 불일치 설명을 미리 만들어 두고 인덱싱
+        mismatch_table = np.empty(self.value_labels.shape, dtype=object)
+        for i in range(len(self.feature_cols)):
+            my_txt = self.label_of(i, my_values[i])
+            for v in range(self.n_values):
+                mismatch_table[i, v] = {
+                    "category": self.col_labels[i],
+                    "my_value": my_txt,
+                    "mate_value": self.value_labels[i, v]
+                }
+        
+        in_range = (partner_profiles >= 0) & (partner_profiles < self.n_values)
+        clipped = np.clip(partner_profiles, 0, self.n_values - 1)
         
-        return match_items, mismatch_items
+        explanations = []
+        for r, (row_equal, row_values, row_in_range) in enumerate(zip(equal, clipped, in_range)):
+            diff = np.flatnonzero(~row_equal)
+            mismatch_items = mismatch_table[diff, row_values[diff]].tolist()
+            if not row_in_range[diff].all():
+                for j, i in enumerate(diff):
+                    if not row_in_range[i]:
+                        mismatch_items[j] = {
+                            "category": self.col_labels[i],
+                            "my_value": self.label_of(i, my_values[i]),
+                            "mate_value": self.label_of(i, partner_profiles[r, i])
+                        }
+            explanations.append((self.col_labels[row_equal].tolist(), mismatch_items))
+        
+        return explanations
+    
+    def profile_key(self, user_data: dict, constraint=None):
+        return (
+            user_data['student_id'],
+            hash((user_data['gender'],) + tuple(user_data[col] for col in self.feature_cols)),
+            constraint
+        )
     
-    def recommend(self, user_data: dict, count=5, page=1):
+    def rank_candidates(self, user_data: dict, index, need, cached=None, constraint=None):
+        """후보를 점수순으로 최소 need명까지 정렬합니다. 캐시된 순위로 충분하면 그대로 사용합니다"""
         target_student_id = user_data['student_id']
-        target_gender = user_data['gender']
         
-        target_vec = self.preprocess_input(user_data)
-        target_cluster = self.kmeans.predict(target_vec)[0]
+        if cached is not None:
+            cluster_ids = self.search.candidate_clusters(
+                self.centroids, index, cached.target, cached.cluster_id, target_student_id, need, constraint,
+                graph=self.cluster_graph
+            )
+            if cluster_ids == cached.cluster_ids and (cached.complete or len(cached.positions) >= need):
+                return cached
+        
+        target_vecs, target_clusters, target_words = self.vectorize([user_data])
+        target_cluster = int(target_clusters[0])
         
-        candidates = self.users_df[
-            (self.users_df['student_id'] != target_student_id) &
-            (self.users_df['gender'] == target_gender) &
-            (self.users_df['cluster_id'] == target_cluster)
-        ].copy()
+        cluster_ids = self.search.candidate_clusters(
+            self.centroids, index, target_vecs[0], target_cluster, target_student_id, need, constraint,
+            graph=self.cluster_graph
+        )
+        sims, positions = index.score(target_vecs[0], cluster_ids, target_student_id, target_words[0], constraint)
+        order = top_k(sims, max(need, RANK_DEPTH), positions)
+        return RankedList(
+            target=target_vecs[0],
+            cluster_id=target_cluster,
+            cluster_ids=cluster_ids,
+            positions=positions[order],
+            scores=sims[order],
+            complete=len(order) == len(sims)
+        )
+    
+    def recommend(self, user_data: dict, count=5, page=1, strict=False):
+        """strict=True면 서로의 흡연/음주 조건을 만족하는 후보만 추천합니다.
         
-        if len(candidates) < count*page:
-            candidates = self.users_df[
-                (self.users_df['student_id'] != target_student_id) &
-                (self.users_df['gender'] == target_gender)
-            ].copy()
+        인덱스/중심점은 쓰는 쪽이 새 객체로 교체하므로 잠금 없이 참조만 잡고 채점합니다
+        """
+        # 세대를 인덱스보다 먼저 읽어야 그 사이 바뀐 인덱스로 만든 순위를 캐시에 넣지 않음
+        generation = self.rank_cache.generation
+        target_gender = user_data['gender']
         
-        if len(candidates) == 0:
+        index = self.gender_index.get(target_gender)
+        if index is None:
             return []
         
-        candidate_vecs = self.weighted_features_df.loc[candidates.index]
-        sims = cosine_similarity(target_vec, candidate_vecs)[0]
+        start_idx = (page - 1) * count
+        end_idx = start_idx + count
+        
+        constraint = mutual_constraint(user_data) if strict else None
+        key = self.profile_key(user_data, constraint)
+        cached = self.rank_cache.get(key)
+        ranked = self.rank_candidates(user_data, index, count*page, cached, constraint)
+        if ranked is not cached:
+            self.rank_cache.put(key, ranked, generation)
         
-        candidates['match_score'] = sims * 100
-        sorted_candidates = candidates.sort_values(by='match_score', ascending=False)
+        if len(ranked.positions) == 0:
+            return []
+        
+        top_positions = ranked.positions[start_idx:end_idx]
+        top_scores = ranked.scores[start_idx:end_idx].astype(np.float64) * 100
+        return self.build_results(user_data, top_positions, top_scores)
+    
+    def recommend_batch(self, users: list, count=5, page=1, strict=False):
+        """여러 학생을 (성별, 후보 범위)로 묶어 행렬곱으로 한 번에 추천합니다 (recommend처럼 잠금 없이 채점)"""
+        if not users:
+            return []
         
+        need = count*page
         start_idx = (page - 1) * count
         end_idx = start_idx + count
-        top_matches = sorted_candidates.iloc[start_idx:end_idx]
+        
+        gender_index = self.gender_index
+        target_vecs, target_clusters, target_words = self.vectorize(users)
+        groups = {}
+        for i, user in enumerate(users):
+            index = gender_index.get(user['gender'])
+            if index is None:
+                continue
+            constraint = mutual_constraint(user) if strict else None
+            cluster_ids = self.search.candidate_clusters(
+                self.centroids, index, target_vecs[i], int(target_clusters[i]), user['student_id'], need, constraint,
+                graph=self.cluster_graph
+            )
+            groups.setdefault((user['gender'], tuple(sorted(cluster_ids)), constraint), []).append(i)
+        
+        recommendations = [[] for _ in users]
+        for (gender, cluster_ids, constraint), members in groups.items():
+            index = gender_index[gender]
+            for chunk_start in range(0, len(members), BATCH_CHUNK):
+                rows = members[chunk_start:chunk_start + BATCH_CHUNK]
+                sims, positions = index.score_many(
+                    target_vecs[rows], list(cluster_ids), [users[i]['student_id'] for i in rows], target_words[rows], constraint
+                )
+                orders = top_k_rows(sims, need, positions)
+                for r, i in enumerate(rows):
+                    order = orders[r, start_idx:end_idx]
+                    order = order[np.isfinite(sims[r, order])]
+                    recommendations[i] = self.build_results(
+                        users[i], positions[order], sims[r, order].astype(np.float64) * 100
+                    )
+        
+        return [
+            {"student_id": user['student_id'], "recommendations": recs}
+            for user, recs in zip(users, recommendations)
+        ]
+    
+    def build_results(self, user_data: dict, top_positions, top_scores):
+        explanations = self.explain_match_detail(user_data, self.users['profile'][top_positions])
+        columns = {col: self.users[col][top_positions].tolist() for col in RESULT_COLUMNS}
         
         results = []
-        for _, row in top_matches.iterrows():
-            m_items, mm_items = self.explain_match_detail(user_data, row)
+        for i, (m_items, mm_items) in enumerate(explanations):
             results.append({
-                "student_id": row['student_id'],
-                "major": row['major'],
-                "match_rate": round(row['match_score'], 1),
-                "is_smoker": bool(row['is_smoker']),
-                "is_drinker": bool(row['is_drinker']),
-                "sensitive_heat": bool(row.get('sensitive_heat', False)),
-                "sensitive_cold": bool(row.get('sensitive_cold', False)),
+                "student_id": columns['student_id'][i],
+                "major": columns['major'][i],
+                "match_rate": round(float(top_scores[i]), 1),
+                "is_smoker": bool(columns['is_smoker'][i]),
+                "is_drinker": bool(columns['is_drinker'][i]),
+                "sensitive_heat": bool(columns['sensitive_heat'][i]),
+                "sensitive_cold": bool(columns['sensitive_cold'][i]),
                 "match_items": m_items,
                 "mismatch_items": mm_items
             })
         
         return results
+    
+    # ======================
+    # 온라인 유저 추가/삭제
+    # ======================
+    def find_user(self, student_id):
+        for gender, index in self.gender_index.items():
+            if student_id in index.location:
+                return gender, index
+        return None, None
+    
+    def update_centroid(self, cluster_id, vec, sign):
+        """미니배치 K-Means와 같은 방식(학습률 1/count)으로 중심점을 갱신합니다. sign=-1이면 제거"""
+        self.centroid_counts[cluster_id] += sign
+        count = self.centroid_counts[cluster_id]
+        if count > 0:
+            # 읽는 쪽이 잠금 없이 들고 있을 수 있으므로 새 배열로 교체
+            centroids = self.centroids.copy()
+            centroids[cluster_id] += sign * (vec - centroids[cluster_id]) / count
+            self.centroids = centroids
+            if self.profile_table is not None:
+                # 중심점이 움직였으므로 테이블의 클러스터 번호는 다음 재클러스터링 전까지 직접 계산
+                self.profile_table.clusters = None
+    
+    def memory_usage(self):
+        """유저 데이터/인덱스/프로필 테이블이 차지하는 대략적인 바이트 수 (풀 레지스트리 메모리 예산용)"""
+        with self.lock:
+            total = 0
+            if self.users is not None:
+                total += self.users.nbytes()
+            total += sum(index.nbytes() for index in self.gender_index.values())
+            if self.profile_table is not None:
+                total += self.profile_table.nbytes()
+            return total
+    
+    def user_count(self):
+        """현재 풀에 있는(삭제되지 않은) 유저 수"""
+        return int(self.users['alive'].sum())
+    
+    def user_records(self, positions):
+        """UserTable 행 위치 -> recommend에 그대로 넣을 수 있는 유저 dict 목록 (벤치마크 등에서 풀 유저를 요청자로 쓸 때)"""
+        positions = np.asarray(positions, dtype=np.int64)
+        columns = {col: self.users[col][positions].tolist() for col in USER_COLUMNS}
+        profiles = self.users['profile'][positions].tolist()
+        records = []
+        for i, profile in enumerate(profiles):
+            record = {col: values[i] for col, values in columns.items()}
+            record.update(zip(self.feature_cols, profile))
+            records.append(record)
+        return records
+    
+    def centroid_drift(self):
+        shift = np.linalg.norm(self.centroids - self.fit_centroids, axis=1).max()
+        return float(shift / self.centroid_spacing)
+    
+    def remove_user(self, student_id):
+        gender, index = self.find_user(student_id)
+        if index is None:
+            return False
+        index = index.copy([index.location[student_id][0]])
+        cluster_id, position = index.remove(student_id)
+        self.gender_index = {**self.gender_index, gender: index}
+        self.users.kill(position)
+        self.update_centroid(cluster_id, self.users['weighted'][position].astype(np.float64), -1)
+        return True
+    
+    def upsert_user(self, user_data: dict):
+        """유저를 추가하거나(이미 있으면 교체) 가장 가까운 클러스터에 넣습니다. 전체 재학습은 하지 않습니다"""
+        with self.lock:
+            vecs, clusters, words = self.vectorize([user_data])
+            vec, cluster_id, word = vecs[0], int(clusters[0]), int(words[0])
+            if self.packer is not None and word < 0:
+                raise ValueError("설문 응답 값이 허용 범위를 벗어났습니다.")
+            self.remove_user(user_data['student_id'])
+            row = {col: user_data.get(col, False) for col in USER_COLUMNS}
+            row.update({
+                "profile": [user_data[col] for col in self.feature_cols],
+                "weighted": vec,
+                "cluster_id": cluster_id,
+            })
+            position = self.users.append(row)
+            
+            index = self.gender_index.get(user_data['gender'])
+            if index is None:
+                index = GenderIndex.empty(len(self.feature_cols), self.packer)
+            else:
+                index = index.copy([cluster_id])
+            traits = trait_masks({name: [user_data.get(name, False)] for name in TRAITS})[0]
+            index.add(user_data['student_id'], cluster_id, vec, position, word, int(traits))
+            self.gender_index = {**self.gender_index, user_data['gender']: index}
+            self.update_centroid(cluster_id, vec, +1)
+            self.rank_cache.clear()
+            drift = self.centroid_drift()
+            pool_size = sum(len(index) for index in self.gender_index.values())
+        
+        if drift > RECLUSTER_DRIFT:
+            self.start_recluster()
+        return {"student_id": user_data['student_id'], "cluster_id": cluster_id, "pool_size": pool_size}
+    
+    def delete_user(self, student_id):
+        with self.lock:
+            removed = self.remove_user(student_id)
+            if removed:
+                self.rank_cache.clear()
+                drift = self.centroid_drift()
+        if removed and drift > RECLUSTER_DRIFT:
+            self.start_recluster()
+        return removed
+    
+    def start_recluster(self):
+        with self.lock:
+            if self.recluster_thread is not None and self.recluster_thread.is_alive():
+                return
+            self.recluster_thread = threading.Thread(target=self.recluster, daemon=True)
+            self.recluster_thread.start()
+    
+    def recluster(self):
+        """현재 중심점에서 시작해 전체 유저로 K-Means를 다시 학습하고 인덱스를 교체합니다"""
+        self.recluster_state = "running"
+        try:
+            self.run_recluster()
+            self.recluster_state = "ready"
+            self.recluster_error = None
+        except Exception as e:
+            self.recluster_error = str(e) or type(e).__name__
+            self.recluster_state = "failed"
+            print(f"❌ 재클러스터링 실패: {e}")
+        self.recluster_finished_at = datetime.now().isoformat()
+    
+    def recluster_status(self):
+        with self.lock:
+            drift = self.centroid_drift()
+        return {
+            "state": self.recluster_state,
+            "finished_at": self.recluster_finished_at,
+            "error": self.recluster_error,
+            "drift": round(drift, 4),
+        }
+    
+    def run_recluster(self):
+        print(f"⏳ 중심점 이동({self.centroid_drift():.2f}) - 백그라운드 재클러스터링 시작...")
+        with self.lock:
+            alive = np.flatnonzero(self.users['alive'])
+            weighted = self.users['weighted'][alive].astype(np.float64)
+            init = self.centroids.copy()
+        
+        kmeans = KMeans(n_clusters=len(init), init=init, n_init=1, random_state=42)
+        kmeans.fit(weighted)
+        
+        with self.lock:
+            # 학습 중에 추가된 유저까지 새 중심점으로 다시 배정
+            self.centroids = kmeans.cluster_centers_
+            alive = np.flatnonzero(self.users['alive'])
+            labels = self.assign_clusters(self.users['weighted'][alive])
+            self.users['cluster_id'][alive] = labels
+            self.set_centroids(kmeans.cluster_centers_, labels)
+            self.build_indexes()
+        print("✅ 재클러스터링 완료!")
+    
+    # ======================
+    # 기숙사 전체 방 배정
+    # ======================
+    def assign_rooms(self, gender=None, k=ASSIGN_K, objective="max_weight"):
+        """성별마다 학생 전체를 2인실로 배정합니다. 스냅샷만 잠금 안에서 뜨고 계산은 잠금 밖에서 합니다"""
+        with self.lock:
+            alive = np.flatnonzero(self.users['alive'])
+            genders = self.users['gender'][alive]
+            targets = [gender] if gender is not None else list(dict.fromkeys(genders.tolist()))
+            snapshots = {}
+            for g in targets:
+                rows = alive[genders == g]
+                snapshots[g] = (
+                    self.users['student_id'][rows].tolist(),
+                    self.users['weighted'][rows].copy(),
+                    self.users['cluster_id'][rows].copy(),
+                )
+            centroids = self.centroids.copy()
+        
+        if gender is not None and len(snapshots[gender][0]) == 0:
+            raise ValueError(f"해당 성별의 학생이 없습니다: {gender}")
+        
+        return {
+            g: solve_assignment(student_ids, vecs, labels, centroids, k=k, objective=objective)
+            for g, (student_ids, vecs, labels) in snapshots.items()
+        }
 
 # Pydantic 모델
 class StudentInput(BaseModel):
@@ -210,91 +747,321 @@ class StudentInput(BaseModel):
     friend_invite: int
     dorm_stay: int
 
+class MachineEvent(BaseModel):
+    room: str
+    machine: str  # washer / dryer
+    event: str  # start / finish
+    timestamp: Optional[datetime] = None  # 없으면 서버 수신 시각, 시간대가 없으면 LAUNDRY_TZ 시각
+
 app = FastAPI(
     title="Dormitory AI Service",
     description="세탁실 혼잡도 예측 + 빨래지수 + 룸메이트 매칭 AI API",
     version="2.0"
 )
 
-# 전역 매칭 엔진 및 세탁 모델
+# 전역 매칭 엔진 및 세탁실 예측표 (백그라운드 로드가 끝나면 채워짐)
 matching_engine = None
-laundry_model = None
+laundry_base = None  # 로더가 만든 예측표
+laundry_forecast = None  # 실시간 관측을 섞은 예측표
+laundry_responses = None  # 요일(0=월) -> 미리 만든 /predict 응답
+laundry_live = LiveOccupancy()
+assignment_jobs = AssignmentJobs()
+
+def load_matching_engine():
+    # 컬럼형 유저 저장소가 있으면 우선 사용
+    dummy_file_path = USER_STORE_PATH if is_user_store(USER_STORE_PATH) else "data/dormitory_users.json"
+    engine = DormMatchAI_Server(dummy_file_path)
+    engine.load_and_train(artifact_dir=ARTIFACT_DIR)
+    return engine
+
+def set_matching_engine(engine):
+    global matching_engine
+    matching_engine = engine
+    pool_registry.pin(DEFAULT_POOL, engine)
+
+def set_laundry_forecast(forecast):
+    """예측표(모델)가 바뀔 때마다 요일별 /predict 응답을 다시 만듭니다"""
+    global laundry_base
+    laundry_base = forecast
+    refresh_laundry_forecast()
+
+def refresh_laundry_forecast():
+    """기존 예측표에 실시간 관측을 섞어 /predict 응답을 다시 만듭니다"""
+    global laundry_forecast, laundry_responses
+    base = laundry_base
+    if base is None:
+        return
+    forecast = laundry_live.blend(base) if laundry_live.closed_hours else base
+    laundry_responses = build_predict_responses(forecast)
+    laundry_forecast = forecast
+
+def build_predict_responses(forecast):
+    """요일별 /predict 응답을 미리 만들어 둡니다 (date만 요청마다 채움)"""
+    responses = {}
+    for day_of_week in range(7):
+        predicted = forecast.predicted[day_of_week]
+        probabilities = forecast.probabilities[day_of_week]
+        expected = getattr(forecast, "expected", None)
+        peak_hour = int(np.argmax(predicted))
+        recommend_hour = int(np.argmin(predicted))
+        responses[day_of_week] = {
+            "peak_message": f"🔥 {peak_hour}시는 매우 혼잡할 예정이에요",
+            "recommend_message": f"👍 {recommend_hour}시 이후 이용을 추천해요",
+            "timeline": [
+                {
+                    "hour": hour,
+                    "predicted_congestion": int(predicted[hour]),
+                    "probabilities": {str(c): round(float(p), 4) for c, p in zip(forecast.classes, probabilities[hour])},
+                    **({"expected_running_washers": round(float(expected[day_of_week, hour]), 2)} if expected is not None else {}),
+                }
+                for hour in range(24)
+            ],
+        }
+    return responses
+
+# 풀(기숙사 동·학기)별 매칭 데이터: data/pools/<풀 ID>.store 또는 .json / .jsonl
+POOL_DIR = os.environ.get("MATCH_POOL_DIR", "data/pools")
+POOL_MEMORY_BUDGET_MB = int(os.environ.get("MATCH_POOL_MEMORY_MB", "1024"))
+DEFAULT_POOL = "default"
+POOL_ID_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9._-]*")
+
+def pool_data_path(pool_id):
+    if not POOL_ID_PATTERN.fullmatch(pool_id):
+        raise KeyError(pool_id)
+    for suffix in (".store", ".json", ".jsonl"):
+        path = os.path.join(POOL_DIR, pool_id + suffix)
+        if os.path.exists(path):
+            return path
+    raise KeyError(pool_id)
+
+def load_pool_engine(pool_id):
+    engine = DormMatchAI_Server(pool_data_path(pool_id))
+    engine.load_and_train(artifact_dir=ARTIFACT_DIR)
+    return engine
+
+pool_registry = EngineRegistry(load_pool_engine, POOL_MEMORY_BUDGET_MB * 2**20)
+
+# 무중단 재로드: 새 엔진을 백그라운드에서 만든 뒤 교체. MATCH_RELOAD_WATCH초마다 데이터 파일 변경 감시 (0이면 끔)
+MATCH_RELOAD_WATCH = float(os.environ.get("MATCH_RELOAD_WATCH", "0"))
+# POST /admin/reload 호출 시 X-Admin-Token 헤더가 일치해야 함 (설정하지 않으면 수동 리로드는 꺼짐)
+ADMIN_TOKEN = os.environ.get("MATCH_ADMIN_TOKEN")
+
+def build_pool_engine(pool_id):
+    return load_matching_engine() if pool_id == DEFAULT_POOL else load_pool_engine(pool_id)
+
+def install_pool_engine(pool_id, engine):
+    if pool_id == DEFAULT_POOL:
+        set_matching_engine(engine)
+    else:
+        pool_registry.replace(pool_id, engine)
+    print(f"✅ 매칭 풀 '{pool_id}' 교체 완료 ({engine.data_path}, {engine.user_count()}명)")
+
+pool_reloader = PoolReloader(build_pool_engine, install_pool_engine)
+
+matching_loader = BackgroundLoader("matching", load_matching_engine, on_ready=set_matching_engine)
+# 세탁실 모델 학습(시뮬레이션 + MLP)은 CPU를 오래 쓰므로 별도 프로세스에서 실행
+laundry_loader = BackgroundLoader("laundry", load_forecast, on_ready=set_laundry_forecast, in_process=False)
+MODEL_LOADERS = {loader.name: loader for loader in (matching_loader, laundry_loader)}
 
 @app.on_event("startup")
 def startup_event():
-    global matching_engine, laundry_model
     print("🚀 서버 시작 중...")
     
-    # 매칭 모델 로드
-    dummy_file_path = "data/dormitory_users.json"
-    matching_engine = DormMatchAI_Server(dummy_file_path)
-    matching_engine.load_and_train()
-    
-    # 세탁 모델 로드 (lazy loading)
-    laundry_model = get_model()
+    # 모델은 백그라운드에서 로드하고 서버는 바로 요청을 받음
+    for loader in MODEL_LOADERS.values():
+        loader.start()
+    if MATCH_RELOAD_WATCH > 0:
+        pool_reloader.watch(pool_registry.items, MATCH_RELOAD_WATCH)
     
-    print("✅ 모든 모델 로드 완료!")
+    print("✅ 서버 시작 완료! (모델은 백그라운드에서 로드 중 - /ready 확인)")
+
+def require_ready(loader, model):
+    """모델이 아직 준비되지 않았으면 바로 503을 반환합니다"""
+    if model is None:
+        detail = f"Service Unavailable - {loader.name} model is {loader.state}"
+        if loader.error:
+            detail += f": {loader.error}"
+        raise HTTPException(status_code=503, detail=detail, headers={"Retry-After": "5"})
+
+def get_engine(pool=None):
+    """pool이 없으면 기본 매칭 엔진, 있으면 레지스트리에서 해당 풀 엔진을 (필요하면 로드해서) 반환합니다"""
+    if pool is None or pool == DEFAULT_POOL:
+        require_ready(matching_loader, matching_engine)
+        return matching_engine
+    try:
+        return pool_registry.get(pool)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"해당 매칭 풀이 없습니다: {pool}")
+    except Exception as e:
+        print(f"Error: {e}")
+        raise HTTPException(status_code=500, detail=f"매칭 풀 로드 실패: {e}")
 
 # ======================
 # 헬스 체크
 # ======================
 @app.get("/health")
 def health_check():
-    if matching_engine is None:
-        raise HTTPException(status_code=503, detail="Service Unavailable - Model not loaded")
+    """liveness: 프로세스가 살아 있으면 모델 상태와 관계없이 200"""
     return {"status": "healthy", "service": "dormitory-ai-service"}
 
+@app.get("/ready")
+def readiness_check():
+    """readiness: 모든 모델이 준비되면 200, 아니면 503 + 모델별 상태/로드 시간"""
+    models = {name: loader.status() for name, loader in MODEL_LOADERS.items()}
+    ready = all(model["state"] == "ready" for model in models.values())
+    body = {"ready": ready, "models": models}
+    if not ready:
+        # 200일 때와 같은 모양으로 ({"detail": ...}로 감싸지 않음)
+        return JSONResponse(status_code=503, content=body, headers={"Retry-After": "5"})
+    return body
+
 # ======================
 # 룸메이트 매칭 API
 # ======================
+GENDER_MAP = {
+    "MALE": "남성",
+    "FEMALE": "여성",
+    "male": "남성",
+    "female": "여성"
+}
+
+def to_user_dict(user_input: StudentInput):
+    user_dict = user_input.dict()
+    if user_dict["gender"] in GENDER_MAP:
+        user_dict["gender"] = GENDER_MAP[user_dict["gender"]]
+    return user_dict
+
 @app.post("/recommend")
-def get_recommendation(user_input: StudentInput, count: int = 5, page: int = 1):
-    if matching_engine is None:
-        raise HTTPException(status_code=500, detail="Model is not loaded")
+def get_recommendation(user_input: StudentInput, count: int = 5, page: int = 1, strict: bool = False, pool: str = None):
+    engine = get_engine(pool)
     
     try:
-        user_dict = user_input.dict()
-        
-        gender_map = {
-            "MALE": "남성",
-            "FEMALE": "여성",
-            "male": "남성",
-            "female": "여성"
-        }
-        
-        if user_dict["gender"] in gender_map:
-            user_dict["gender"] = gender_map[user_dict["gender"]]
-        
-        recommendations = matching_engine.recommend(user_dict, count=count, page=page)
+        user_dict = to_user_dict(user_input)
+        recommendations = engine.recommend(user_dict, count=count, page=page, strict=strict)
         return recommendations
     except Exception as e:
         print(f"Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/recommend/batch")
+def get_batch_recommendation(user_inputs: List[StudentInput], count: int = 5, page: int = 1, strict: bool = False, pool: str = None):
+    engine = get_engine(pool)
+    
+    try:
+        user_dicts = [to_user_dict(user_input) for user_input in user_inputs]
+        return engine.recommend_batch(user_dicts, count=count, page=page, strict=strict)
+    except Exception as e:
+        print(f"Error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/users")
+def upsert_user(user_input: StudentInput, pool: str = None):
+    engine = get_engine(pool)
+    
+    try:
+        return engine.upsert_user(to_user_dict(user_input))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"Error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.delete("/users/{student_id}")
+def delete_user(student_id: str, pool: str = None):
+    engine = get_engine(pool)
+    
+    if not engine.delete_user(student_id):
+        raise HTTPException(status_code=404, detail="해당 학번의 유저가 없습니다.")
+    return {"student_id": student_id, "deleted": True}
+
+@app.post("/assignments", status_code=202)
+def create_assignment(gender: str = None, k: int = ASSIGN_K, objective: str = "max_weight", pool: str = None):
+    engine = get_engine(pool)
+    if objective not in OBJECTIVES:
+        raise HTTPException(status_code=400, detail=f"objective는 {', '.join(OBJECTIVES)} 중 하나여야 합니다.")
+    if k < 1:
+        raise HTTPException(status_code=400, detail="k는 1 이상이어야 합니다.")
+    
+    gender = GENDER_MAP.get(gender, gender)
+    try:
+        return assignment_jobs.submit(engine.assign_rooms, gender=gender, k=k, objective=objective)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+
+@app.get("/pools")
+def get_pools():
+    status = pool_registry.status()
+    status["recluster"] = {pool_id: engine.recluster_status() for pool_id, engine in pool_registry.items()}
+    return status
+
+@app.post("/admin/reload", status_code=202)
+def reload_pool(pool: str = None, x_admin_token: str = Header(None)):
+    """풀 데이터를 다시 읽어 백그라운드에서 새 엔진을 만들고, 준비되면 기존 엔진과 교체합니다"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="MATCH_ADMIN_TOKEN이 설정되지 않아 수동 리로드를 사용할 수 없습니다.")
+    if x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="관리자 토큰이 올바르지 않습니다.")
+    pool = pool or DEFAULT_POOL
+    if pool != DEFAULT_POOL:
+        try:
+            pool_data_path(pool)
+        except KeyError:
+            raise HTTPException(status_code=404, detail=f"해당 매칭 풀이 없습니다: {pool}")
+    loader = pool_reloader.reload(pool)
+    return {"pool": pool, **loader.status()}
+
+@app.get("/admin/reload")
+def get_reload_status():
+    return pool_reloader.status()
+
+@app.get("/assignments/{job_id}")
+def get_assignment(job_id: str):
+    job = assignment_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="해당 배정 작업이 없습니다.")
+    return job
+
 # ======================
 # 1️⃣ 혼잡도 예측 API
 # ======================
 @app.get("/predict")
 def predict(date: str):
-    if laundry_model is None:
-        raise HTTPException(status_code=500, detail="Laundry model is not loaded")
+    responses = laundry_responses
+    require_ready(laundry_loader, responses)
     
     target_date = datetime.strptime(date, "%Y-%m-%d").date()
-    result = predict_day(laundry_model, target_date)
-    peak_hour = int(
-        result.loc[result["predicted_congestion"].idxmax(), "hour"]
-    )
-    recommend_hour = int(
-        result.loc[result["predicted_congestion"].idxmin(), "hour"]
-    )
-    return {
-        "date": date,
-        "peak_message": f"🔥 {peak_hour}시는 매우 혼잡할 예정이에요",
-        "recommend_message": f"👍 {recommend_hour}시 이후 이용을 추천해요",
-        "timeline": result[
-            ["hour", "predicted_congestion"]
-        ].to_dict(orient="records")
-    }
+    return {"date": date, **responses[target_date.weekday()]}
+
+@app.post("/laundry/events")
+def laundry_events(events: List[MachineEvent]):
+    """세탁기/건조기 시작·종료 이벤트를 받아 실시간 가동 기록에 반영합니다"""
+    now = now_minute()
+    batch = []
+    for e in events:
+        if e.room not in laundry_live.room_index:
+            raise HTTPException(status_code=400, detail=f"알 수 없는 세탁실: {e.room}")
+        if e.machine not in MACHINES:
+            raise HTTPException(status_code=400, detail=f"알 수 없는 기기: {e.machine} (가능: {', '.join(MACHINES)})")
+        if e.event not in EVENTS:
+            raise HTTPException(status_code=400, detail=f"알 수 없는 이벤트: {e.event} (가능: {', '.join(EVENTS)})")
+        minute = minute_of(e.timestamp) if e.timestamp is not None else now
+        # 미래 시각은 링 버퍼를 가짜 기록으로 채우고 시계를 앞당겨 버리므로 거절 (배치 전체를 반영하지 않음)
+        if minute > now + LIVE_MAX_SKEW_MINUTES:
+            raise HTTPException(status_code=400, detail=f"서버 시각보다 {LIVE_MAX_SKEW_MINUTES}분 넘게 앞선 이벤트입니다: {e.timestamp}")
+        # 링 버퍼보다 오래된 시각은 기록할 칸이 없음
+        if minute < now - laundry_live.ring_hours * 60:
+            raise HTTPException(status_code=400, detail=f"{laundry_live.ring_hours}시간보다 오래된 이벤트입니다: {e.timestamp}")
+        batch.append((e.room, e.machine, e.event, minute))
+    
+    closed = laundry_live.ingest(batch)
+    # 한 시간이 마감될 때만 예측표를 다시 섞음
+    if closed:
+        refresh_laundry_forecast()
+    return {"accepted": len(batch), "closed_hours": closed}
+
+@app.get("/laundry/live")
+def laundry_live_status(hours: int = Query(24, ge=1, le=LIVE_RING_HOURS)):
+    return laundry_live.status(hours=hours)
 
 # ======================
 # 2️⃣ 오늘의 빨래지수 API
@@ -0,0 +1,132 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+import numpy as np
+
+from .user_store import fingerprint
+
+# ======================
+# 매칭 모델 아티팩트 (학습 결과 저장/로드)
+# ======================
+# 저장 형식이 바뀌면 올려서 이전 아티팩트를 무효화
+ARTIFACT_VERSION = 1
+ARTIFACT_DIR = "data/artifacts"
+# 같은 데이터 경로의 아티팩트는 최신 몇 개만 남김 (데이터가 바뀔 때마다 새 키로 쌓이므로)
+ARTIFACT_KEEP = 2
+
+# 메모리 매핑(np.load mmap_mode)을 위해 배열마다 .npy 파일 하나씩 저장
+ARRAY_FILES = {
+    "weighted": "weighted.npy",
+    "labels": "labels.npy",
+    "centroids": "centroids.npy",
+    "scaler_min": "scaler_min.npy",
+    "scaler_scale": "scaler_scale.npy",
+    "data_min": "data_min.npy",
+    "data_max": "data_max.npy",
+}
+
+
+def artifact_key(data_path, weights, n_clusters="12"):
+    """데이터 내용(파일 또는 유저 저장소) + 가중치 + 클러스터 개수 설정 + 저장 형식 버전으로 아티팩트 키를 만듭니다"""
+    h = hashlib.sha256()
+    h.update(f"v{ARTIFACT_VERSION}".encode())
+    h.update(fingerprint(data_path).encode())
+    h.update(json.dumps(weights, sort_keys=True).encode())
+    h.update(f"k={n_clusters}".encode())
+    return h.hexdigest()
+
+
+def artifact_path(artifact_dir, key):
+    return os.path.join(artifact_dir, f"matching-{key[:16]}")
+
+
+def save_artifact(artifact_dir, key, arrays, meta):
+    """배열과 메타데이터를 임시 폴더에 쓴 뒤 rename으로 한 번에 교체합니다"""
+    os.makedirs(artifact_dir, exist_ok=True)
+    target = artifact_path(artifact_dir, key)
+    tmp = tempfile.mkdtemp(prefix=".matching-", dir=artifact_dir)
+    try:
+        for name, filename in ARRAY_FILES.items():
+            np.save(os.path.join(tmp, filename), np.ascontiguousarray(arrays[name]))
+        meta = dict(meta, key=key, version=ARTIFACT_VERSION, created_at=datetime.now().isoformat())
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        if os.path.exists(target):
+            shutil.rmtree(target)
+        os.rename(tmp, target)
+    except Exception:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    if meta.get("data_path"):
+        prune_artifacts(artifact_dir, meta["data_path"], keep=ARTIFACT_KEEP, current=target)
+    return target
+
+
+def prune_artifacts(artifact_dir, data_path, keep=ARTIFACT_KEEP, current=None):
+    """같은 데이터 경로로 만든 matching-* 아티팩트 중 current와 최신 것을 합쳐 keep개만 남기고 지웁니다.
+
+    이미 메모리 매핑으로 열린 파일은 지워도 그 프로세스에서는 계속 읽을 수 있습니다.
+    """
+    source = os.path.abspath(data_path)
+    found = []
+    for name in os.listdir(artifact_dir):
+        path = os.path.join(artifact_dir, name)
+        if not name.startswith("matching-") or path == current:
+            continue
+        try:
+            with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if meta.get("data_path") and os.path.abspath(meta["data_path"]) == source:
+            found.append((meta.get("created_at", ""), path))
+
+    found.sort(reverse=True)
+    removed = []
+    for _, path in found[max(0, keep - (current is not None)):]:
+        shutil.rmtree(path, ignore_errors=True)
+        removed.append(path)
+    if removed:
+        print(f"🧹 오래된 매칭 아티팩트 {len(removed)}개 삭제 ({data_path})")
+    return removed
+
+
+def load_artifact(artifact_dir, key):
+    """키가 일치하는 아티팩트를 메모리 매핑으로 엽니다. 없거나 버전이 다르면 None"""
+    path = artifact_path(artifact_dir, key)
+    meta_path = os.path.join(path, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("key") != key or meta.get("version") != ARTIFACT_VERSION:
+        return None
+    arrays = {
+        name: np.load(os.path.join(path, filename), mmap_mode="r")
+        for name, filename in ARRAY_FILES.items()
+    }
+    return meta, arrays
+
+
+# ======================
+# 오프라인 빌드
+# ======================
+if __name__ == "__main__":
+    from .main import DormMatchAI_Server
+
+    parser = argparse.ArgumentParser(description="매칭 모델을 학습해 아티팩트로 저장합니다")
+    parser.add_argument("--data", default="data/dormitory_users.json")
+    parser.add_argument("--out", default=ARTIFACT_DIR)
+    parser.add_argument("--clusters", default=None, help='클러스터 개수 또는 "auto" (기본: MATCH_CLUSTERS 환경변수)')
+    parser.add_argument("--metrics", action="store_true", help="고정 K도 샘플 실루엣 / 최대 클러스터 비율을 계산해 기록")
+    args = parser.parse_args()
+
+    engine = DormMatchAI_Server(args.data, n_clusters=args.clusters, cluster_metrics=args.metrics)
+    engine.load_and_train(artifact_dir=args.out, force_train=True)
+    selection = engine.cluster_selection
+    print(f"✅ 아티팩트 저장 완료: {artifact_path(args.out, engine.artifact_key)} (K={selection['k']}, {selection['method']})")
@@ -0,0 +1,273 @@
+import argparse
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+# ======================
+# 파라미터
+# ======================
+ASSIGN_K = 10           # 학생당 남기는 이웃 수 (희소 그래프 차수)
+ASSIGN_PROBE = 2        # 이웃을 찾을 때 함께 보는 가까운 클러스터 수
+ASSIGN_CHUNK = 1024     # 한 번에 채점하는 학생 수
+ASSIGN_ROUNDS = 20      # 2-opt 개선 반복 횟수 상한
+LEFTOVER_DENSE = 2048   # 남은 학생이 이 수 이하면 서로 전부 비교 (그보다 많으면 가까운 클러스터 안에서만)
+LEFTOVER_ROUNDS = 50    # 남은 학생 매칭 반복 상한 (넘으면 클러스터 순으로 차례대로 짝지음)
+OBJECTIVES = ("stable", "max_weight")
+JOB_HISTORY = 32
+JOB_WORKERS = 1         # 동시에 푸는 배정 작업 수
+JOB_QUEUE = 4           # 대기 + 실행 중 작업 수 상한 (넘으면 거절)
+
+
+# ======================
+# 희소 top-k 이웃 그래프
+# ======================
+def unit_rows(vecs):
+    vecs = np.asarray(vecs, dtype=np.float32)
+    norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+    return vecs / np.where(norms == 0, 1, norms)
+
+
+def topk_edges(units, rows, pool, k):
+    """units[rows] 각각의 pool 안 top-k 이웃 -> (i, j, 유사도) 배열. 본인은 제외"""
+    src, dst, sims = [], [], []
+    pool = np.asarray(pool)
+    kk = min(k, len(pool) - 1)
+    if kk <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    slot = np.full(len(units), -1, dtype=np.int64)
+    slot[pool] = np.arange(len(pool))
+    pool_units = units[pool]
+    for start in range(0, len(rows), ASSIGN_CHUNK):
+        chunk = rows[start:start + ASSIGN_CHUNK]
+        scores = units[chunk] @ pool_units.T
+        own = slot[chunk]
+        scores[np.flatnonzero(own >= 0), own[own >= 0]] = -np.inf
+        top = np.argpartition(scores, -kk, axis=1)[:, -kk:]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        keep = np.isfinite(top_scores)
+        src.append(np.repeat(chunk, kk)[keep.ravel()])
+        dst.append(pool[top][keep])
+        sims.append(top_scores[keep])
+    if not src:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    return np.concatenate(src), np.concatenate(dst), np.concatenate(sims)
+
+
+def neighbour_graph(units, labels, centroids, k=ASSIGN_K, probe=ASSIGN_PROBE):
+    """클러스터마다 가까운 probe개 클러스터 안에서만 top-k를 찾아 무방향 간선 목록을 만듭니다 (n×n 행렬 없음)"""
+    members = {int(c): np.flatnonzero(labels == c) for c in np.unique(labels)}
+    cluster_ids = np.array(sorted(members))
+    src, dst, sims = [], [], []
+    for c in cluster_ids:
+        dists = ((centroids[cluster_ids] - centroids[c]) ** 2).sum(axis=1)
+        near = cluster_ids[np.argsort(dists, kind="stable")[:probe]]
+        pool = np.concatenate([members[int(n)] for n in near])
+        s, d, w = topk_edges(units, members[int(c)], pool, k)
+        src.append(s)
+        dst.append(d)
+        sims.append(w)
+    return unique_edges(np.concatenate(src), np.concatenate(dst), np.concatenate(sims), len(units))
+
+
+def unique_edges(src, dst, sims, n):
+    lo, hi = np.minimum(src, dst), np.maximum(src, dst)
+    keys, first = np.unique(lo * n + hi, return_index=True)
+    return keys // n, keys % n, sims[first]
+
+
+# ======================
+# 매칭
+# ======================
+def greedy_match(src, dst, sims, mate):
+    """유사도가 높은 간선부터 짝을 짓습니다. 유사도가 대칭이므로 결과는 (그래프 안에서) 안정 매칭입니다"""
+    order = np.lexsort((dst, src, -sims))
+    for a, b in zip(src[order].tolist(), dst[order].tolist()):
+        if mate[a] < 0 and mate[b] < 0:
+            mate[a], mate[b] = b, a
+
+
+def match_leftovers(units, labels, centroids, mate, k, rounds=LEFTOVER_ROUNDS):
+    """그래프 이웃이 모두 짝지어진 학생끼리 다시 top-k 그래프를 만들어 짝을 짓습니다.
+
+    남은 학생이 많으면 neighbour_graph처럼 가까운 클러스터 안에서만 찾고(희소), LEFTOVER_DENSE명 이하면 서로 전부 비교합니다.
+    rounds번 뒤에도 남으면 클러스터 순으로 차례대로 짝짓습니다.
+    """
+    edges = []
+    for _ in range(rounds):
+        rest = np.flatnonzero(mate < 0)
+        if len(rest) < 2:
+            return edges
+        if len(rest) <= LEFTOVER_DENSE:
+            src, dst, sims = unique_edges(*topk_edges(units, rest, rest, k), len(units))
+        else:
+            src, dst, sims = neighbour_graph(units[rest], labels[rest], centroids, k)
+            src, dst = rest[src], rest[dst]
+        greedy_match(src, dst, sims, mate)
+        edges.append((src, dst, sims))
+
+    rest = np.flatnonzero(mate < 0)
+    rest = rest[np.argsort(labels[rest], kind="stable")]
+    for a, b in zip(rest[0::2].tolist(), rest[1::2].tolist()):
+        mate[a], mate[b] = b, a
+    return edges
+
+
+def pair_scores(units, mate):
+    scores = np.zeros(len(mate), dtype=np.float32)
+    matched = mate >= 0
+    scores[matched] = (units[matched] * units[mate[matched]]).sum(axis=1)
+    return scores
+
+
+def improve_two_opt(units, src, dst, sims, mate, rounds=ASSIGN_ROUNDS):
+    """간선 (a,c)에 대해 a-b, c-d 두 방을 a-c, b-d로 바꿔 합이 커지면 교환합니다"""
+    swaps = 0
+    for _ in range(rounds):
+        a = np.concatenate([src, dst])
+        c = np.concatenate([dst, src])
+        w = np.concatenate([sims, sims])
+        b, d = mate[a], mate[c]
+        ok = (b >= 0) & (d >= 0) & (b != c)
+        a, b, c, d, w = a[ok], b[ok], c[ok], d[ok], w[ok]
+        current = pair_scores(units, mate)
+        gain = w + (units[b] * units[d]).sum(axis=1) - current[a] - current[c]
+        pos = np.flatnonzero(gain > 1e-6)
+        if len(pos) == 0:
+            break
+
+        touched = np.zeros(len(mate), dtype=bool)
+        applied = 0
+        for e in pos[np.argsort(-gain[pos], kind="stable")].tolist():
+            quad = (a[e], b[e], c[e], d[e])
+            if touched[list(quad)].any():
+                continue
+            touched[list(quad)] = True
+            mate[a[e]], mate[c[e]] = c[e], a[e]
+            mate[b[e]], mate[d[e]] = d[e], b[e]
+            applied += 1
+        swaps += applied
+    return swaps
+
+
+def solve_assignment(student_ids, vecs, labels, centroids, k=ASSIGN_K, objective="max_weight"):
+    """한 성별 학생 전체를 2인실로 배정합니다. 홀수면 한 명이 남습니다"""
+    if objective not in OBJECTIVES:
+        raise ValueError(f"알 수 없는 배정 목표: {objective} (가능: {', '.join(OBJECTIVES)})")
+    start = time.perf_counter()
+    units = unit_rows(vecs)
+    mate = np.full(len(units), -1, dtype=np.int64)
+
+    labels = np.asarray(labels)
+    centroids = np.asarray(centroids, dtype=np.float32)
+    src, dst, sims = neighbour_graph(units, labels, centroids, k)
+    n_edges = len(src)
+    greedy_match(src, dst, sims, mate)
+    leftover_edges = match_leftovers(units, labels, centroids, mate, k)
+
+    swaps = 0
+    if objective == "max_weight":
+        for s, d, w in leftover_edges:
+            src, dst, sims = np.concatenate([src, s]), np.concatenate([dst, d]), np.concatenate([sims, w])
+        swaps = improve_two_opt(units, src, dst, sims, mate)
+
+    scores = pair_scores(units, mate)
+    first = np.flatnonzero((mate >= 0) & (np.arange(len(mate)) < mate))
+    order = first[np.argsort(-scores[first], kind="stable")]
+    rooms = [
+        {
+            "students": [student_ids[i], student_ids[mate[i]]],
+            "match_rate": round(float(scores[i]) * 100, 1),
+        }
+        for i in order.tolist()
+    ]
+    room_scores = scores[order].astype(np.float64) * 100
+    return {
+        "rooms": rooms,
+        "unassigned": [student_ids[i] for i in np.flatnonzero(mate < 0).tolist()],
+        "stats": {
+            "students": len(units),
+            "rooms": len(rooms),
+            "edges": n_edges,
+            "swaps": swaps,
+            "total_match_rate": round(float(room_scores.sum()), 1),
+            "mean_match_rate": round(float(room_scores.mean()), 1) if len(rooms) else None,
+            "min_match_rate": round(float(room_scores.min()), 1) if len(rooms) else None,
+            "elapsed_sec": round(time.perf_counter() - start, 3),
+        },
+    }
+
+
+# ======================
+# 비동기 배정 작업
+# ======================
+class JobQueueFull(RuntimeError):
+    pass
+
+
+class AssignmentJobs:
+    """배정 작업을 JOB_WORKERS개 스레드 풀에서 실행하고 최근 JOB_HISTORY개의 상태/결과를 보관합니다.
+
+    대기 + 실행 중 작업이 max_pending개면 새 작업은 JobQueueFull로 거절합니다
+    """
+
+    def __init__(self, max_jobs=JOB_HISTORY, workers=JOB_WORKERS, max_pending=JOB_QUEUE):
+        self.max_jobs = max_jobs
+        self.max_pending = max_pending
+        self.jobs = OrderedDict()
+        self.pending = 0
+        self.lock = threading.Lock()
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="assign")
+
+    def submit(self, fn, **params):
+        job_id = uuid.uuid4().hex
+        job = {"job_id": job_id, "status": "queued", "params": params, "created_at": datetime.now().isoformat()}
+        with self.lock:
+            if self.pending >= self.max_pending:
+                raise JobQueueFull(f"배정 작업이 이미 {self.pending}개 대기 중입니다")
+            self.pending += 1
+            self.jobs[job_id] = job
+            while len(self.jobs) > self.max_jobs:
+                self.jobs.popitem(last=False)
+        queued = dict(job)
+        self.pool.submit(self.run, job, fn, params)
+        return queued
+
+    def run(self, job, fn, params):
+        job["status"] = "running"
+        try:
+            job["result"] = fn(**params)
+            job["status"] = "done"
+        except Exception as e:
+            print(f"Error: {e}")
+            job["error"] = str(e)
+            job["status"] = "failed"
+        job["finished_at"] = datetime.now().isoformat()
+        with self.lock:
+            self.pending -= 1
+
+    def get(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+        return dict(job) if job is not None else None
+
+
+if __name__ == "__main__":
+    from .main import DormMatchAI_Server
+
+    parser = argparse.ArgumentParser(description="기숙사 전체 룸메이트 배정")
+    parser.add_argument("--data", default="data/dormitory_users.json")
+    parser.add_argument("--gender", default=None)
+    parser.add_argument("--k", type=int, default=ASSIGN_K)
+    parser.add_argument("--objective", choices=OBJECTIVES, default="max_weight")
+    args = parser.parse_args()
+
+    engine = DormMatchAI_Server(args.data)
+    engine.load_and_train()
+    result = engine.assign_rooms(gender=args.gender, k=args.k, objective=args.objective)
+    print(json.dumps({gender: r["stats"] for gender, r in result.items()}, ensure_ascii=False, indent=2))
@@ -0,0 +1,157 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+from .user_generator import write_store
+from .user_store import max_rss_mb
+
+# ======================
+# 추천 벤치마크
+# ======================
+BENCH_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+BENCH_COMBOS = [(5, 1), (5, 3), (20, 1), (50, 2)]  # (count, page)
+BENCH_REQUESTS = 200
+BENCH_BATCH = 1000
+BENCH_BATCH_TRIALS = 5  # 배치 처리량 반복 측정 횟수 (중앙값 사용, 워밍업 1회 별도)
+BENCH_DIR = "data/bench"
+
+
+def build_pool(n, workdir, seed=42):
+    """더미 유저 n명을 만들어 컬럼형 저장소로 씁니다"""
+    path = os.path.join(workdir, f"pool_{n}.store")
+    write_store(path, n, seed=seed)
+    return path
+
+
+def percentiles(samples):
+    ms = np.asarray(samples) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "mean_ms": round(float(ms.mean()), 3),
+    }
+
+
+def bench_pool(path, n_requests=BENCH_REQUESTS, batch_size=BENCH_BATCH, combos=BENCH_COMBOS, seed=0, batch_trials=BENCH_BATCH_TRIALS):
+    """한 풀에 대해 학습 시간 / 조합별 요청 지연시간 / 배치 처리량 / 최대 RSS를 잽니다"""
+    from .main import DormMatchAI_Server
+
+    engine = DormMatchAI_Server(path)
+    start = time.perf_counter()
+    engine.load_and_train()
+    train_sec = time.perf_counter() - start
+
+    # 풀에 있는 유저를 요청자로 사용 (조합마다 다른 유저로 캐시를 비운 상태에서 측정)
+    rng = np.random.default_rng(seed)
+    alive = np.flatnonzero(engine.users['alive'])
+    n_users = len(alive)
+
+    def sample_users(k):
+        return engine.user_records(alive[rng.integers(0, n_users, k)])
+
+    latency = []
+    for count, page in combos:
+        requests = sample_users(n_requests)
+        engine.rank_cache.clear()
+        samples = []
+        for user in requests:
+            t = time.perf_counter()
+            engine.recommend(user, count=count, page=page)
+            samples.append(time.perf_counter() - t)
+        latency.append(dict(count=count, page=page, requests=n_requests, **percentiles(samples)))
+
+    # 워밍업 1회 뒤 매번 다른 유저 묶음으로 batch_trials번 재서 중앙값 사용
+    engine.recommend_batch(sample_users(batch_size), count=5, page=1)
+    batch_samples = []
+    for _ in range(batch_trials):
+        batch_users = sample_users(batch_size)
+        engine.rank_cache.clear()
+        start = time.perf_counter()
+        engine.recommend_batch(batch_users, count=5, page=1)
+        batch_samples.append(time.perf_counter() - start)
+    batch_sec = float(np.median(batch_samples))
+
+    return {
+        "n_users": n_users,
+        "load_and_train_seconds": round(train_sec, 3),
+        "latency": latency,
+        "batch": {
+            "size": batch_size,
+            "trials": batch_trials,
+            "seconds": round(batch_sec, 3),
+            "min_seconds": round(min(batch_samples), 3),
+            "max_seconds": round(max(batch_samples), 3),
+            "users_per_second": round(batch_size / batch_sec, 1),
+        },
+        "max_rss_mb": round(max_rss_mb(), 1),
+    }
+
+
+def run_suite(sizes, workdir, n_requests, batch_size, batch_trials=BENCH_BATCH_TRIALS):
+    results = []
+    for n in sizes:
+        start = time.perf_counter()
+        path = build_pool(n, workdir)
+        print(f"▶ {n}명 풀 생성 ({time.perf_counter() - start:.1f}초) - 측정 중...")
+        # 풀마다 새 프로세스에서 측정해 최대 RSS가 섞이지 않게 함
+        out = subprocess.run(
+            [sys.executable, "-m", "code.match_bench", "pool", path,
+             "--requests", str(n_requests), "--batch", str(batch_size), "--batch-trials", str(batch_trials)],
+            check=True, capture_output=True, text=True
+        )
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        print(f"✅ {n}명: 학습 {result['load_and_train_seconds']}초, RSS {result['max_rss_mb']}MB")
+        results.append(result)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="풀 크기별 추천 성능 벤치마크 (JSON 저장)")
+    sub = parser.add_subparsers(dest="command")
+
+    p_pool = sub.add_parser("pool", help="저장소 하나를 측정해 JSON 한 줄 출력")
+    p_pool.add_argument("path")
+    p_pool.add_argument("--requests", type=int, default=BENCH_REQUESTS)
+    p_pool.add_argument("--batch", type=int, default=BENCH_BATCH)
+    p_pool.add_argument("--batch-trials", type=int, default=BENCH_BATCH_TRIALS)
+
+    parser.add_argument("--sizes", type=int, nargs="+", default=BENCH_SIZES)
+    parser.add_argument("--requests", type=int, default=BENCH_REQUESTS)
+    parser.add_argument("--batch", type=int, default=BENCH_BATCH)
+    parser.add_argument("--batch-trials", type=int, default=BENCH_BATCH_TRIALS)
+    parser.add_argument("--workdir", default=None)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+
+    if args.command == "pool":
+        print(json.dumps(bench_pool(args.path, n_requests=args.requests, batch_size=args.batch, batch_trials=args.batch_trials)))
+        sys.exit(0)
+
+    from .main import MATCH_CLUSTERS, MATCH_GRAPH_DEGREE, MATCH_GRAPH_MARGIN, MATCH_NPROBE, MATCH_SCORING, MATCH_SEARCH
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="match-bench-")
+    report = {
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "cpu_count": os.cpu_count(),
+        "config": {
+            "search": MATCH_SEARCH, "nprobe": MATCH_NPROBE, "scoring": MATCH_SCORING, "clusters": MATCH_CLUSTERS,
+            "graph_degree": MATCH_GRAPH_DEGREE, "graph_margin": MATCH_GRAPH_MARGIN,
+        },
+        "results": run_suite(args.sizes, workdir, args.requests, args.batch, args.batch_trials),
+    }
+    out = args.out or os.path.join(BENCH_DIR, f"match-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"✅ 결과 저장: {out}")
@@ -0,0 +1,161 @@
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.cluster import KMeans
+from sklearn.metrics import silhouette_score
+
+# ======================
+# 클러스터 개수(K) 선택
+# ======================
+K_MIN = 2
+K_MAX = 20
+K_SAMPLE = 5000  # 실루엣 점수 계산에 쓰는 샘플 수 (O(샘플²))
+K_MAX_SHARE = 0.25  # 가장 큰 클러스터가 전체 유저에서 차지할 수 있는 최대 비율 (탐색 후보 수 상한)
+K_SEED = 42
+
+# 워커 프로세스마다 한 번만 받아 두는 학습 데이터 / 실루엣 샘플 위치
+_data = None
+_sample = None
+
+
+def init_worker(data, sample):
+    global _data, _sample
+    _data, _sample = data, sample
+
+
+def farthest_point(data, centroids, sample):
+    """샘플 중 가장 가까운 중심점까지의 거리가 가장 먼 점 (다음 K의 새 중심점 초기값)"""
+    points = data[sample]
+    dists = ((points[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2).min(axis=1)
+    return points[int(dists.argmax())]
+
+
+def evaluate_ks(ks, seed=K_SEED):
+    """연속된 K 목록을 차례로 학습합니다. 첫 K는 k-means++, 다음 K부터는 이전 중심점 + 가장 먼 점에서 시작(warm start)"""
+    results = []
+    centroids = None
+    for k in ks:
+        start = time.perf_counter()
+        if centroids is None or len(centroids) != k - 1:
+            kmeans = KMeans(n_clusters=k, random_state=seed)
+        else:
+            init = np.vstack([centroids, farthest_point(_data, centroids, _sample)])
+            kmeans = KMeans(n_clusters=k, init=init, n_init=1, random_state=seed)
+        labels = kmeans.fit_predict(_data)
+        centroids = kmeans.cluster_centers_
+        sample_labels = labels[_sample]
+        silhouette = silhouette_score(_data[_sample], sample_labels) if len(np.unique(sample_labels)) > 1 else -1.0
+        results.append({
+            "k": k,
+            "inertia": round(float(kmeans.inertia_), 4),
+            "silhouette": round(float(silhouette), 4),
+            "largest_share": round(float(np.bincount(labels).max() / len(labels)), 4),
+            "seconds": round(time.perf_counter() - start, 3),
+            "centroids": centroids,
+        })
+    return results
+
+
+def split_ks(ks, n_groups):
+    """K 목록을 워커 수만큼 연속 구간으로 나눕니다 (구간 안에서는 warm start)"""
+    return [list(group) for group in np.array_split(np.asarray(ks), n_groups) if len(group)]
+
+
+def elbow_k(results):
+    """K-inertia 곡선을 [0, 1]로 정규화했을 때 양 끝을 잇는 직선에서 가장 멀리 떨어진 K (엘보)"""
+    ks = np.array([r["k"] for r in results], dtype=np.float64)
+    inertia = np.array([r["inertia"] for r in results], dtype=np.float64)
+    if len(ks) < 3 or inertia[0] == inertia[-1]:
+        return int(ks[0])
+    x = (ks - ks[0]) / (ks[-1] - ks[0])
+    y = (inertia - inertia[-1]) / (inertia[0] - inertia[-1])
+    return int(ks[int(np.argmax(1 - x - y))])
+
+
+def select_k(data, k_min=K_MIN, k_max=K_MAX, sample_size=K_SAMPLE, workers=None, seed=K_SEED, max_share=K_MAX_SHARE):
+    """K 후보를 프로세스 풀에서 나눠 학습하고, inertia 엘보 이상이면서 가장 큰 클러스터가 max_share 이하인 가장 작은 K를 고릅니다.
+
+    실루엣 점수만으로 고르면 덩어리 두세 개(K=2~3)가 뽑혀 클러스터 하나가 풀의 절반이 되므로 참고용으로만 기록합니다.
+    반환: (중심점, 메타데이터 dict). 메타데이터에는 K별 inertia/실루엣 점수/최대 클러스터 비율이 들어갑니다.
+    """
+    data = np.ascontiguousarray(data, dtype=np.float64)
+    k_max = min(k_max, len(data) - 1)
+    if k_max < k_min:
+        raise ValueError(f"유저 수({len(data)})가 너무 적어 K를 {k_min}개 이상으로 나눌 수 없습니다")
+    ks = list(range(k_min, k_max + 1))
+    rng = np.random.default_rng(seed)
+    sample = np.sort(rng.choice(len(data), size=min(sample_size, len(data)), replace=False))
+    workers = max(1, min(workers or os.cpu_count() or 1, len(ks)))
+
+    start = time.perf_counter()
+    groups = split_ks(ks, workers)
+    if workers == 1:
+        init_worker(data, sample)
+        results = evaluate_ks(ks, seed)
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker, initargs=(data, sample)
+        ) as pool:
+            results = [r for group in pool.map(evaluate_ks, groups, [seed] * len(groups)) for r in group]
+
+    elbow = elbow_k(results)
+    eligible = [r for r in results if r["k"] >= elbow and r["largest_share"] <= max_share]
+    # 상한을 만족하는 K가 없으면 가장 큰 클러스터가 가장 작은 K
+    best = eligible[0] if eligible else min(results, key=lambda r: (r["largest_share"], r["k"]))
+    meta = {
+        "method": "elbow",
+        "k": best["k"],
+        "elbow": elbow,
+        "max_share": max_share,
+        "inertia": best["inertia"],
+        "silhouette": best["silhouette"],
+        "largest_share": best["largest_share"],
+        "sample_size": len(sample),
+        "workers": workers,
+        "seconds": round(time.perf_counter() - start, 3),
+        "candidates": [{key: r[key] for key in ("k", "inertia", "silhouette", "largest_share", "seconds")} for r in results],
+    }
+    return best["centroids"], meta
+
+
+def fixed_k_metrics(data, labels, inertia, sample_size=K_SAMPLE, seed=K_SEED):
+    """K를 고정해 학습했을 때도 같은 기준(inertia / 샘플 실루엣 / 최대 클러스터 비율)으로 기록합니다 (실루엣 계산이 O(샘플²)이라 요청할 때만)"""
+    rng = np.random.default_rng(seed)
+    sample = np.sort(rng.choice(len(data), size=min(sample_size, len(data)), replace=False))
+    sample_labels = np.asarray(labels)[sample]
+    silhouette = silhouette_score(np.asarray(data)[sample], sample_labels) if len(np.unique(sample_labels)) > 1 else -1.0
+    return {
+        "method": "fixed",
+        "k": int(len(np.unique(labels))),
+        "inertia": round(float(inertia), 4),
+        "silhouette": round(float(silhouette), 4),
+        "largest_share": round(float(np.bincount(labels).max() / len(labels)), 4),
+        "sample_size": len(sample),
+    }
+
+
+if __name__ == "__main__":
+    from .main import DormMatchAI_Server
+
+    parser = argparse.ArgumentParser(description="클러스터 개수(K)별 inertia / 샘플 실루엣 점수 / 최대 클러스터 비율을 계산해 K를 고릅니다")
+    parser.add_argument("--data", default="data/dormitory_users.json")
+    parser.add_argument("--k-min", type=int, default=K_MIN)
+    parser.add_argument("--k-max", type=int, default=K_MAX)
+    parser.add_argument("--sample", type=int, default=K_SAMPLE)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-share", type=float, default=K_MAX_SHARE)
+    args = parser.parse_args()
+
+    engine = DormMatchAI_Server(args.data)
+    engine.load_and_train()
+    _, meta = select_k(engine.users['weighted'], args.k_min, args.k_max, args.sample, args.workers, max_share=args.max_share)
+    for row in meta["candidates"]:
+        mark = " ◀" if row["k"] == meta["k"] else ""
+        print(f"K={row['k']:>3}  inertia={row['inertia']:>14.1f}  silhouette={row['silhouette']:.4f}  largest={row['largest_share']:.3f}  ({row['seconds']}초){mark}")
+    print(json.dumps({key: value for key, value in meta.items() if key != "candidates"}, ensure_ascii=False))
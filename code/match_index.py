@@ -0,0 +1,617 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+
+def grown(array, min_capacity):
+    """용량을 2배씩 늘린 새 배열 (append를 분할상환 O(1)로 유지)"""
+    capacity = max(min_capacity, 2 * len(array), 16)
+    out = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+    out[:len(array)] = array
+    return out
+
+
+# ======================
+# 유저 컬럼 저장소
+# ======================
+class UserTable:
+    """유저 정보를 컬럼별 NumPy 배열로 보관합니다. 행 위치(position)는 삭제 후에도 재사용하지 않습니다"""
+
+    def __init__(self, columns):
+        # columns: 이름 -> 배열 (첫 번째 축이 유저)
+        self.size = len(next(iter(columns.values())))
+        self._columns = {name: np.asarray(values) for name, values in columns.items()}
+        self._columns["alive"] = np.ones(self.size, dtype=bool)
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, name):
+        return self._columns[name][:self.size]
+
+    def append(self, values):
+        position = self.size
+        for name, column in self._columns.items():
+            if position >= len(column):
+                column = self._columns[name] = grown(column, position + 1)
+            column[position] = values.get(name, True if name == "alive" else 0)
+        self.size = position + 1
+        return position
+
+    def kill(self, position):
+        self._columns["alive"][position] = False
+
+    def nbytes(self):
+        return sum(column.nbytes for column in self._columns.values())
+
+
+# ======================
+# 비트 패킹 프로필
+# ======================
+class ProfilePacker:
+    """설문 응답을 uint32 한 개로 패킹하고, AND + 가중 popcount로 가중 내적을 계산합니다.
+
+    0/1 항목(스케일 후 0 → 0)은 한 비트씩(bitplane), 그 외 항목(clean_cycle 등)은 작은 비트 필드에 담습니다.
+    가중 코사인의 분자는 sum_i (w_i*s_i)^2 * bit_i(a & b) + sum_f T_f[a_f, b_f] 로 정확히 같아집니다.
+    """
+
+    def __init__(self, domain_sizes, scale, offset, weights):
+        domain_sizes = [int(d) for d in domain_sizes]
+        self.n_features = len(domain_sizes)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.offset = np.asarray(offset, dtype=np.float64)
+        self.weights = np.asarray(weights, dtype=np.float64)
+
+        self.planes, self.fields = [], []
+        for i, d in enumerate(domain_sizes):
+            if d == 2 and self.offset[i] == 0:
+                self.planes.append(i)
+            else:
+                self.fields.append(i)
+
+        self.shifts = np.zeros(self.n_features, dtype=np.int64)
+        self.widths = np.zeros(self.n_features, dtype=np.int64)
+        bit = 0
+        for i in self.planes + self.fields:
+            self.shifts[i] = bit
+            self.widths[i] = max(1, int(np.ceil(np.log2(domain_sizes[i]))))
+            bit += self.widths[i]
+        if bit > 32:
+            raise ValueError(f"프로필이 32비트를 넘습니다 ({bit}비트)")
+        self.domain_sizes = np.array(domain_sizes, dtype=np.int64)
+
+        # bitplane 가중 popcount를 16비트 반쪽별 테이블 조회 두 번으로 계산
+        bit_weights = np.zeros(32, dtype=np.float64)
+        self.plane_mask = 0
+        for i in self.planes:
+            bit_weights[self.shifts[i]] = (self.weights[i] * self.scale[i]) ** 2
+            self.plane_mask |= 1 << int(self.shifts[i])
+        self.plane_mask = np.uint32(self.plane_mask)
+        halves = np.arange(1 << 16, dtype=np.uint32)
+        bits = ((halves[:, None] >> np.arange(16, dtype=np.uint32)) & 1).astype(np.float64)
+        self.plane_lo = bits @ bit_weights[:16]
+        self.plane_hi = bits @ bit_weights[16:]
+
+        # 필드 항목은 (내 값, 상대 값)별 가중 곱 테이블
+        self.field_tables = []
+        for i in self.fields:
+            values = np.arange(domain_sizes[i])
+            scaled = (values * self.scale[i] + self.offset[i]) * self.weights[i]
+            self.field_tables.append((np.uint32(self.shifts[i]), np.uint32((1 << int(self.widths[i])) - 1), np.outer(scaled, scaled)))
+
+    def pack(self, values):
+        """(m, 항목 수) 응답 값 -> uint32 코드 (범위를 벗어난 행은 -1, int64로 반환)"""
+        values = np.asarray(values, dtype=np.int64).reshape(-1, self.n_features)
+        valid = ((values >= 0) & (values < self.domain_sizes)).all(axis=1)
+        words = (np.where(valid[:, None], values, 0) << self.shifts).sum(axis=1)
+        words[~valid] = -1
+        return words
+
+    def unpack(self, words):
+        words = np.asarray(words, dtype=np.int64)
+        return (words[:, None] >> self.shifts) & ((1 << self.widths) - 1)
+
+    def plane_dot(self, z):
+        return self.plane_lo[z & np.uint32(0xFFFF)] + self.plane_hi[z >> np.uint32(16)]
+
+    def dot(self, target_words, words):
+        """target_words (g,) 와 words (n,)의 가중 내적 (g, n)"""
+        t = np.asarray(target_words).astype(np.uint32)[:, None]
+        words = np.asarray(words, dtype=np.uint32)
+        dot = self.plane_dot((t & self.plane_mask) & words)
+        for shift, mask, table in self.field_tables:
+            dot += table[(t >> shift) & mask, (words >> shift) & mask]
+        return dot
+
+    def dot_self(self, words):
+        words = np.asarray(words).astype(np.uint32)
+        dot = self.plane_dot(words & self.plane_mask)
+        for shift, mask, table in self.field_tables:
+            field = (words >> shift) & mask
+            dot += table[field, field]
+        return dot
+
+    def weighted(self, words):
+        """패킹된 코드 -> float64 가중 벡터 (범위 밖 값을 가진 요청자와 비교할 때 사용)"""
+        return (self.unpack(words) * self.scale + self.offset) * self.weights
+
+
+# ======================
+# 흡연/음주 조건 비트셋
+# ======================
+TRAITS = ("is_smoker", "wants_smoker", "is_drinker", "wants_drinker")
+IS_SMOKER, WANTS_SMOKER, IS_DRINKER, WANTS_DRINKER = (1 << i for i in range(len(TRAITS)))
+NO_CONSTRAINT = (0, 0)
+
+
+def trait_masks(columns):
+    """TRAITS 컬럼(bool 배열) -> 유저별 uint8 비트마스크"""
+    masks = np.zeros(len(columns[TRAITS[0]]), dtype=np.uint8)
+    for i, name in enumerate(TRAITS):
+        masks |= np.asarray(columns[name], dtype=np.uint8) << i
+    return masks
+
+
+def mutual_constraint(user):
+    """서로의 흡연/음주 조건을 모두 만족하는 후보만 남기는 (필수 비트, 금지 비트)"""
+    require, forbid = 0, 0
+    if not user.get('wants_smoker', True):
+        forbid |= IS_SMOKER
+    if user.get('is_smoker', False):
+        require |= WANTS_SMOKER
+    if not user.get('wants_drinker', True):
+        forbid |= IS_DRINKER
+    if user.get('is_drinker', False):
+        require |= WANTS_DRINKER
+    return require, forbid
+
+
+# ======================
+# 매칭 후보 인덱스
+# ======================
+class ClusterBlock:
+    """같은 성별·같은 클러스터 유저들을 연속된 배열로 보관합니다.
+
+    packer가 없으면 가중 벡터(float32 행렬), 있으면 패킹된 프로필(uint32)을 저장합니다.
+    흡연/음주 조건은 TRAITS별 비트셋(행 하나당 1비트)으로 보관해 채점 전에 AND로 후보를 줄입니다.
+    """
+
+    def __init__(self, items, positions, student_ids, packer=None, traits=None):
+        self.packer = packer
+        if packer is None:
+            self._items = np.array(items, dtype=np.float32, order="C")
+            self._norms = np.linalg.norm(self._items, axis=1)
+        else:
+            self._items = np.array(items, dtype=np.uint32)
+            self._norms = np.sqrt(packer.dot_self(self._items))
+        self._positions = np.array(positions, dtype=np.int64)  # UserTable 행 위치
+        self._student_ids = np.array(student_ids, dtype=object)
+        self.size = len(self._positions)
+        traits = np.zeros(self.size, dtype=np.uint8) if traits is None else np.asarray(traits, dtype=np.uint8)
+        self._bits = np.packbits((traits[None, :] >> np.arange(len(TRAITS), dtype=np.uint8)[:, None]) & 1, axis=1)
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def items(self):
+        return self._items[:self.size]
+
+    @property
+    def norms(self):
+        return self._norms[:self.size]
+
+    @property
+    def positions(self):
+        return self._positions[:self.size]
+
+    @property
+    def student_ids(self):
+        return self._student_ids[:self.size]
+
+    def nbytes(self):
+        return sum(a.nbytes for a in (self._items, self._norms, self._positions, self._student_ids, self._bits))
+
+    def get_traits(self, row):
+        bits = (self._bits[:, row >> 3] >> (7 - (row & 7))) & 1
+        return int((bits.astype(np.int64) << np.arange(len(TRAITS))).sum())
+
+    def set_traits(self, row, traits):
+        byte, bit = row >> 3, np.uint8(1 << (7 - (row & 7)))
+        for i in range(len(TRAITS)):
+            if traits >> i & 1:
+                self._bits[i, byte] |= bit
+            else:
+                self._bits[i, byte] &= ~bit
+
+    def select(self, constraint):
+        """조건을 만족하는 행 번호. 조건이 없으면 None (전체)"""
+        require, forbid = constraint or NO_CONSTRAINT
+        if not require and not forbid:
+            return None
+        n_bytes = (self.size + 7) >> 3
+        mask = np.full(n_bytes, 0xFF, dtype=np.uint8)
+        for i in range(len(TRAITS)):
+            if require >> i & 1:
+                mask &= self._bits[i, :n_bytes]
+            elif forbid >> i & 1:
+                mask &= ~self._bits[i, :n_bytes]
+        return np.flatnonzero(np.unpackbits(mask, count=self.size))
+
+    def copy(self):
+        """쓰기용 복사본. 추가/삭제는 복사본에 하고 교체하므로, 읽는 쪽이 들고 있는 블록은 바뀌지 않습니다"""
+        block = ClusterBlock.__new__(ClusterBlock)
+        block.packer = self.packer
+        block._items = self._items.copy()
+        block._norms = self._norms.copy()
+        block._positions = self._positions.copy()
+        block._student_ids = self._student_ids.copy()
+        block._bits = self._bits.copy()
+        block.size = self.size
+        return block
+
+    def append(self, item, position, student_id, traits=0):
+        row = self.size
+        if row >= len(self._positions):
+            self._items = grown(self._items, row + 1)
+            self._norms = grown(self._norms, row + 1)
+            self._positions = grown(self._positions, row + 1)
+            self._student_ids = grown(self._student_ids, row + 1)
+        if (row >> 3) >= self._bits.shape[1]:
+            bits = np.zeros((len(TRAITS), max(2 * self._bits.shape[1], (row >> 3) + 1, 2)), dtype=np.uint8)
+            bits[:, :self._bits.shape[1]] = self._bits
+            self._bits = bits
+        self._items[row] = item
+        if self.packer is None:
+            self._norms[row] = np.linalg.norm(self._items[row])
+        else:
+            self._norms[row] = np.sqrt(self.packer.dot_self(self._items[row:row + 1]))[0]
+        self._positions[row] = position
+        self._student_ids[row] = student_id
+        self.set_traits(row, traits)
+        self.size = row + 1
+        return row
+
+    def remove(self, row):
+        """마지막 행을 row 자리로 옮겨 삭제합니다. 옮겨진 student_id를 반환합니다"""
+        last = self.size - 1
+        moved = None
+        if row != last:
+            self._items[row] = self._items[last]
+            self._norms[row] = self._norms[last]
+            self._positions[row] = self._positions[last]
+            self._student_ids[row] = self._student_ids[last]
+            self.set_traits(row, self.get_traits(last))
+            moved = self._student_ids[row]
+        self._student_ids[last] = None
+        self.set_traits(last, 0)
+        self.size = last
+        return moved
+
+
+def cosine_scores(packer, items, norms, targets, target_words):
+    """targets (g, 항목 수) 대비 후보 items의 코사인 유사도 (g, n). norm이 0이면 유사도 0 (sklearn과 동일)"""
+    if packer is None:
+        dots = np.asarray(targets, dtype=np.float32) @ items.T
+        target_norms = np.linalg.norm(np.asarray(targets, dtype=np.float32), axis=1)
+    else:
+        dots = np.empty((len(target_words), len(items)), dtype=np.float64)
+        target_norms = np.empty(len(target_words), dtype=np.float64)
+        packed = target_words >= 0
+        if packed.any():
+            dots[packed] = packer.dot(target_words[packed], items)
+            target_norms[packed] = np.sqrt(packer.dot_self(target_words[packed]))
+        if not packed.all():
+            # 범위 밖 응답이 있는 요청자는 후보 코드를 가중 벡터로 풀어서 계산
+            loose = np.asarray(targets, dtype=np.float64)[~packed]
+            dots[~packed] = loose @ packer.weighted(items).T
+            target_norms[~packed] = np.linalg.norm(loose, axis=1)
+    dots /= np.where(norms == 0, 1, norms)
+    dots /= np.where(target_norms == 0, 1, target_norms)[:, None]
+    return dots
+
+
+class GenderIndex:
+    """한 성별의 유저를 클러스터별 ClusterBlock으로 나눈 인덱스.
+
+    추가/삭제는 copy()로 만든 새 인덱스에 하고 엔진이 통째로 교체합니다 (읽기는 잠금 없이 참조만 잡고 채점)
+    """
+
+    def __init__(self, items, labels, positions, student_ids, packer=None, traits=None):
+        self.packer = packer
+        self.blocks = {}
+        self.location = {}  # student_id -> (cluster_id, block 내 행)
+        traits = np.zeros(len(labels), dtype=np.uint8) if traits is None else np.asarray(traits, dtype=np.uint8)
+        for cluster_id in np.unique(labels):
+            sel = np.flatnonzero(labels == cluster_id)
+            block = ClusterBlock(items[sel], positions[sel], student_ids[sel], packer, traits[sel])
+            self.blocks[int(cluster_id)] = block
+            for row, sid in enumerate(block.student_ids):
+                self.location[sid] = (int(cluster_id), row)
+
+    @classmethod
+    def empty(cls, n_features, packer=None):
+        items = np.empty(0) if packer is not None else np.empty((0, n_features))
+        return cls(items, np.empty(0), np.empty(0), np.empty(0, dtype=object), packer)
+
+    def __len__(self):
+        return sum(len(block) for block in self.blocks.values())
+
+    def nbytes(self):
+        return sum(block.nbytes() for block in self.blocks.values())
+
+    def copy(self, cluster_ids=()):
+        """블록 목록과 위치 표는 새로 만들고, cluster_ids의 블록만 복사합니다 (나머지 블록은 공유)"""
+        index = GenderIndex.__new__(GenderIndex)
+        index.packer = self.packer
+        index.blocks = dict(self.blocks)
+        for cluster_id in cluster_ids:
+            if cluster_id in index.blocks:
+                index.blocks[cluster_id] = index.blocks[cluster_id].copy()
+        index.location = dict(self.location)
+        return index
+
+    def add(self, student_id, cluster_id, vec, position, word=-1, traits=0):
+        block = self.blocks.get(cluster_id)
+        if block is None:
+            items = np.empty(0) if self.packer is not None else np.empty((0, len(vec)))
+            block = self.blocks[cluster_id] = ClusterBlock(items, np.empty(0), np.empty(0, dtype=object), self.packer)
+        row = block.append(vec if self.packer is None else word, position, student_id, traits)
+        self.location[student_id] = (cluster_id, row)
+
+    def remove(self, student_id):
+        """유저를 인덱스에서 빼고 (cluster_id, UserTable 위치)를 반환합니다"""
+        cluster_id, row = self.location.pop(student_id)
+        block = self.blocks[cluster_id]
+        position = int(block.positions[row])
+        moved = block.remove(row)
+        if moved is not None:
+            self.location[moved] = (cluster_id, row)
+        return cluster_id, position
+
+    def count(self, cluster_ids, exclude_id=None, constraint=None):
+        """exclude_id를 제외하고 조건을 만족하는 후보 수"""
+        total = 0
+        for cluster_id in cluster_ids:
+            block = self.blocks.get(cluster_id)
+            if block is not None:
+                rows = block.select(constraint)
+                total += len(block) if rows is None else len(rows)
+        loc = self.location.get(exclude_id)
+        if loc is not None and loc[0] in cluster_ids:
+            rows = self.blocks[loc[0]].select(constraint)
+            if rows is None or loc[1] in rows:
+                total -= 1
+        return total
+
+    def candidates(self, cluster_ids, constraint=None):
+        """(cluster_id, block, 조건을 만족하는 행 또는 None) 목록. 빈 블록은 건너뜁니다"""
+        out = []
+        for cluster_id in cluster_ids:
+            block = self.blocks.get(cluster_id)
+            if block is None or len(block) == 0:
+                continue
+            rows = block.select(constraint)
+            if rows is not None and len(rows) == 0:
+                continue
+            out.append((cluster_id, block, rows))
+        return out
+
+    def score(self, target, cluster_ids, exclude_id=None, target_word=-1, constraint=None):
+        """지정한 클러스터들의 후보에 대해 (코사인 유사도, UserTable 위치)를 반환합니다"""
+        target = np.asarray(target).reshape(1, -1)
+        target_words = np.array([target_word], dtype=np.int64)
+        loc = self.location.get(exclude_id)
+
+        sims, positions = [], []
+        for cluster_id, block, rows in self.candidates(cluster_ids, constraint):
+            if rows is None:
+                items, norms, block_pos = block.items, block.norms, block.positions
+            else:
+                items, norms, block_pos = block.items[rows], block.norms[rows], block.positions[rows]
+            block_sims = cosine_scores(self.packer, items, norms, target, target_words)[0]
+            if loc is not None and loc[0] == cluster_id:
+                keep = np.arange(len(block)) != loc[1] if rows is None else rows != loc[1]
+                block_sims, block_pos = block_sims[keep], block_pos[keep]
+            sims.append(block_sims)
+            positions.append(block_pos)
+
+        if not sims:
+            return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+        if len(sims) == 1:
+            return sims[0], positions[0]
+        return np.concatenate(sims), np.concatenate(positions)
+
+    def score_many(self, targets, cluster_ids, exclude_ids, target_words=None, constraint=None):
+        """여러 명의 타겟을 행렬곱 한 번으로 채점합니다. 본인 자리는 -inf로 표시합니다"""
+        if target_words is None:
+            target_words = np.full(len(targets), -1, dtype=np.int64)
+
+        parts, offsets, offset = [], {}, 0
+        for cluster_id, block, rows in self.candidates(cluster_ids, constraint):
+            if rows is None:
+                parts.append((block.items, block.norms, block.positions))
+            else:
+                parts.append((block.items[rows], block.norms[rows], block.positions[rows]))
+            offsets[cluster_id] = (offset, rows)
+            offset += len(parts[-1][2])
+
+        if not parts:
+            return np.empty((len(targets), 0), dtype=np.float32), np.empty(0, dtype=np.int64)
+
+        items, norms, positions = (np.concatenate(col) if len(parts) > 1 else col[0] for col in zip(*parts))
+
+        sims = cosine_scores(self.packer, items, norms, targets, np.asarray(target_words, dtype=np.int64))
+
+        for r, student_id in enumerate(exclude_ids):
+            loc = self.location.get(student_id)
+            if loc is None or loc[0] not in offsets:
+                continue
+            base, rows = offsets[loc[0]]
+            if rows is None:
+                sims[r, base + loc[1]] = -np.inf
+            else:
+                at = np.searchsorted(rows, loc[1])
+                if at < len(rows) and rows[at] == loc[1]:
+                    sims[r, base + at] = -np.inf
+        return sims, positions
+
+
+def build_gender_indexes(genders, student_ids, items, labels, positions, packer=None, traits=None):
+    """유저 배열로 성별별 GenderIndex를 만듭니다. items는 가중 벡터 또는 (packer가 있으면) 패킹된 프로필"""
+    items = np.asarray(items)
+    labels = np.asarray(labels)
+    positions = np.asarray(positions)
+    genders = np.asarray(genders, dtype=object)
+    student_ids = np.asarray(student_ids, dtype=object)
+    traits = np.zeros(len(labels), dtype=np.uint8) if traits is None else np.asarray(traits, dtype=np.uint8)
+
+    indexes = {}
+    for gender in dict.fromkeys(genders):
+        sel = np.flatnonzero(genders == gender)
+        indexes[gender] = GenderIndex(items[sel], labels[sel], positions[sel], student_ids[sel], packer, traits[sel])
+    return indexes
+
+
+# ======================
+# 프로필 공간 테이블
+# ======================
+class ProfileTable:
+    """가능한 모든 설문 응답 조합(프로필 코드)별 가중 벡터/norm/클러스터를 미리 계산해 둔 테이블"""
+
+    def __init__(self, domain_sizes, scale, offset, weights, chunk_size=16384):
+        self.domain_sizes = np.asarray(domain_sizes, dtype=np.int64)
+        # 혼합 기수(mixed radix) 인코딩: 마지막 항목이 가장 낮은 자리
+        self.strides = np.ones(len(self.domain_sizes), dtype=np.int64)
+        for i in range(len(self.domain_sizes) - 2, -1, -1):
+            self.strides[i] = self.strides[i + 1] * self.domain_sizes[i + 1]
+        self.size = int(np.prod(self.domain_sizes))
+        self.chunk_size = chunk_size
+        self.scale, self.offset, self.weights = scale, offset, weights
+
+        self.vectors = np.empty((self.size, len(self.domain_sizes)), dtype=np.float32)
+        for start, weighted in self.weighted_chunks():
+            self.vectors[start:start + len(weighted)] = weighted
+        self.norms = np.linalg.norm(self.vectors, axis=1)
+        self.clusters = None
+
+    def nbytes(self):
+        return self.vectors.nbytes + self.norms.nbytes + (self.clusters.nbytes if self.clusters is not None else 0)
+
+    def weighted_chunks(self):
+        for start in range(0, self.size, self.chunk_size):
+            values = self.decode(np.arange(start, min(start + self.chunk_size, self.size)))
+            # MinMaxScaler.transform과 같은 순서로 계산해야 결과가 완전히 일치
+            yield start, (values * self.scale + self.offset) * self.weights
+
+    def decode(self, codes):
+        return (np.asarray(codes)[:, None] // self.strides) % self.domain_sizes
+
+    def encode(self, values):
+        """(m, 항목 수) 응답 값 -> 프로필 코드. 범위를 벗어난 값이 있으면 -1"""
+        values = np.asarray(values, dtype=np.int64)
+        valid = ((values >= 0) & (values < self.domain_sizes)).all(axis=1)
+        codes = values @ self.strides
+        codes[~valid] = -1
+        return codes
+
+    def assign_clusters(self, assign):
+        """중심점이 바뀔 때마다 assign(가중 벡터) 함수로 전체 프로필의 클러스터를 다시 계산합니다"""
+        self.clusters = np.concatenate([assign(weighted) for _, weighted in self.weighted_chunks()]).astype(np.int32)
+
+
+def top_k(scores, k, ties=None):
+    """점수 상위 k개의 인덱스를 내림차순으로 반환합니다 (전체 정렬 대신 argpartition).
+
+    ties(후보별 고유 정수, 예: UserTable 위치)를 주면 같은 점수는 ties 오름차순으로 끊어
+    후보 순서나 k에 관계없이 같은 순위가 나옵니다.
+    """
+    n = len(scores)
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < n:
+        part = np.argpartition(-scores, k - 1)[:k]
+        if ties is not None:
+            # 경계 점수와 같은 후보를 모두 넣은 뒤 ties로 잘라야 argpartition이 고른 임의의 동점자가 섞이지 않음
+            part = np.flatnonzero(scores >= scores[part].min())
+    else:
+        part = np.arange(n)
+    if ties is None:
+        return part[np.argsort(-scores[part], kind='stable')]
+    return part[np.lexsort((ties[part], -scores[part]))][:k]
+
+
+def top_k_rows(scores, k, ties=None):
+    """행마다 점수 상위 k개의 열 인덱스를 내림차순으로 반환합니다 (ties는 top_k와 같음, 열마다 하나)"""
+    n = scores.shape[1]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64)
+    if k < n:
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        part = np.broadcast_to(np.arange(n), scores.shape)
+    picked = np.take_along_axis(scores, part, axis=1)
+    if ties is None:
+        order = np.argsort(-picked, axis=1, kind='stable')
+        return np.take_along_axis(part, order, axis=1)
+    order = np.lexsort((ties[part], -picked), axis=1)
+    result = np.take_along_axis(part, order, axis=1)
+    if k < n:
+        # 경계 점수의 동점자가 k 밖에도 남은 행만 따로 다시 고름
+        floor = picked.min(axis=1, keepdims=True)
+        spill = (scores == floor).sum(axis=1) > (picked == floor).sum(axis=1)
+        for r in np.flatnonzero(spill):
+            result[r] = top_k(scores[r], k, ties)
+    return result
+
+
+# ======================
+# 추천 결과 캐시
+# ======================
+# target: 요청자 가중 벡터, cluster_ids: 점수를 매긴 후보 범위, complete: 후보 전체가 정렬되어 있는지
+RankedList = namedtuple("RankedList", ["target", "cluster_id", "cluster_ids", "positions", "scores", "complete"])
+
+
+class RankedListCache:
+    """(student_id, 프로필 해시)별 정렬된 후보 목록을 TTL + LRU로 보관합니다"""
+
+    def __init__(self, maxsize=2048, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # clear()마다 증가. 읽기 시작 시점의 세대와 다르면 그 사이 인덱스가 바뀐 것이므로 put을 버림
+        self.generation = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value, generation=None):
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
@@ -0,0 +1,102 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+# ======================
+# 매칭 풀 레지스트리
+# ======================
+class EngineRegistry:
+    """풀 ID(기숙사 동·학기별)마다 매칭 엔진을 처음 요청될 때 로드하고, 메모리 예산을 넘으면 오래 안 쓴 풀부터 내립니다.
+
+    같은 풀을 동시에 요청하면 한 번만 로드하고 나머지 요청은 그 결과를 기다립니다.
+    pin()으로 등록한 풀은 내리지 않습니다. 내려간 풀의 온라인 추가/삭제 내역은 다시 로드할 때 사라집니다.
+    """
+
+    def __init__(self, factory, budget_bytes):
+        self.factory = factory  # pool_id -> 로드가 끝난 DormMatchAI_Server (없는 풀이면 KeyError)
+        self.budget_bytes = budget_bytes
+        self.engines = OrderedDict()  # pool_id -> (engine, 메모리 사용량) / LRU 순서
+        self.pinned = {}
+        self.loading = {}  # pool_id -> Future
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def pin(self, pool_id, engine):
+        with self.lock:
+            self.pinned[pool_id] = engine
+
+    def get(self, pool_id):
+        with self.lock:
+            if pool_id in self.pinned:
+                return self.pinned[pool_id]
+            entry = self.engines.get(pool_id)
+            if entry is not None:
+                self.engines.move_to_end(pool_id)
+                return entry[0]
+            future = self.loading.get(pool_id)
+            owner = future is None
+            if owner:
+                future = self.loading[pool_id] = Future()
+
+        if not owner:
+            return future.result()
+
+        try:
+            engine = self.factory(pool_id)
+            size = engine.memory_usage()
+        except BaseException as e:
+            with self.lock:
+                del self.loading[pool_id]
+            future.set_exception(e)
+            raise
+
+        with self.lock:
+            self.engines[pool_id] = (engine, size)
+            del self.loading[pool_id]
+            self.evict(keep=pool_id)
+        future.set_result(engine)
+        return engine
+
+    def replace(self, pool_id, engine):
+        """다시 로드한 엔진으로 교체합니다. 고정된 풀은 고정을 유지하고, 내려가 있던 풀은 새로 올립니다"""
+        size = engine.memory_usage()
+        with self.lock:
+            if pool_id in self.pinned:
+                self.pinned[pool_id] = engine
+                return
+            self.engines[pool_id] = (engine, size)
+            self.engines.move_to_end(pool_id)
+            self.evict(keep=pool_id)
+
+    def items(self):
+        """현재 메모리에 있는 (pool_id, engine) 목록 (고정 풀 포함)"""
+        with self.lock:
+            return list(self.pinned.items()) + [(pool_id, engine) for pool_id, (engine, _) in self.engines.items()]
+
+    def evict(self, keep=None):
+        """예산 안으로 들어올 때까지 가장 오래 안 쓴 풀을 내립니다 (방금 로드한 keep은 제외)"""
+        while self.used_bytes() > self.budget_bytes:
+            victim = next((pool_id for pool_id in self.engines if pool_id != keep), None)
+            if victim is None:
+                break
+            del self.engines[victim]
+            self.evictions += 1
+            print(f"♻️ 매칭 풀 '{victim}' 메모리에서 내림 (예산 {self.budget_bytes / 2**20:.0f}MB)")
+
+    def used_bytes(self):
+        return sum(size for _, size in self.engines.values())
+
+    def status(self):
+        with self.lock:
+            return {
+                "budget_mb": round(self.budget_bytes / 2**20, 1),
+                "used_mb": round(self.used_bytes() / 2**20, 1),
+                "evictions": self.evictions,
+                "pinned": list(self.pinned),
+                "loaded": [
+                    {"pool": pool_id, "memory_mb": round(size / 2**20, 1)}
+                    for pool_id, (_, size) in reversed(self.engines.items())
+                ],
+                "loading": list(self.loading),
+            }
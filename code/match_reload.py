@@ -0,0 +1,64 @@
+import threading
+from functools import partial
+
+from .model_loader import BackgroundLoader
+from .user_store import data_signature
+
+
+# ======================
+# 매칭 풀 무중단 재로드
+# ======================
+class PoolReloader:
+    """풀 데이터를 다시 읽어 새 엔진을 백그라운드에서 만들고, 다 되면 참조 한 번으로 교체합니다 (double buffering).
+
+    교체 전까지는 기존 엔진이 계속 응답하고, 교체 후에도 이미 엔진을 받아 간 요청은 그 엔진으로 끝까지 처리됩니다.
+    재로드 중에는 엔진 두 개가 메모리에 올라가며, 그동안 기존 엔진에 들어온 온라인 추가/삭제는 새 엔진에 옮기지 않습니다.
+    """
+
+    def __init__(self, build, install):
+        self.build = build  # pool_id -> 로드가 끝난 DormMatchAI_Server
+        self.install = install  # (pool_id, engine) -> None
+        self.loaders = {}  # pool_id -> 마지막 재로드 BackgroundLoader
+        self.signatures = {}  # pool_id -> 마지막으로 재로드를 시작한 데이터 서명
+        self.watcher = None
+        self.lock = threading.Lock()
+
+    def reload(self, pool_id, signature=None):
+        """재로드를 시작합니다. 같은 풀이 이미 재로드 중이면 그 작업을 그대로 반환합니다"""
+        with self.lock:
+            if self.reloading(pool_id):
+                return self.loaders[pool_id]
+            loader = BackgroundLoader(
+                f"reload:{pool_id}", partial(self.build, pool_id), on_ready=partial(self.install, pool_id)
+            )
+            self.loaders[pool_id] = loader
+            self.signatures[pool_id] = signature
+        loader.start()
+        return loader
+
+    def reloading(self, pool_id):
+        loader = self.loaders.get(pool_id)
+        return loader is not None and loader.state in ("pending", "loading")
+
+    def status(self):
+        with self.lock:
+            return {pool_id: loader.status() for pool_id, loader in self.loaders.items()}
+
+    def watch(self, engines, interval):
+        """interval초마다 로드된 풀의 데이터 파일을 확인해 바뀌었으면 재로드합니다. engines: () -> [(pool_id, engine)]"""
+        def loop():
+            while not stop.wait(interval):
+                for pool_id, engine in engines():
+                    signature = data_signature(engine.data_path)
+                    if signature is None or signature == engine.data_signature:
+                        continue
+                    # 재로드 중이거나 같은 내용으로 이미 시도했으면 (실패 포함) 파일이 다시 바뀔 때까지 기다림
+                    if self.reloading(pool_id) or signature == self.signatures.get(pool_id):
+                        continue
+                    print(f"🔄 매칭 풀 '{pool_id}' 데이터 변경 감지 - 재로드 시작")
+                    self.reload(pool_id, signature)
+
+        stop = threading.Event()
+        self.watcher = threading.Thread(target=loop, name="reload-watch", daemon=True)
+        self.watcher.start()
+        return stop
@@ -0,0 +1,202 @@
+import argparse
+import json
+import time
+
+import numpy as np
+
+# 중심점 근접 그래프: 클러스터마다 가장 가까운 GRAPH_DEGREE개 중심점과 연결 (양방향)
+# 서버에서는 기본으로 쓰지 않음 (main의 MATCH_GRAPH_DEGREE로 켤 때 차수)
+GRAPH_DEGREE = 3
+# 후보가 need × GRAPH_MARGIN명 이상 모일 때까지 넓힘 (ring 경계에서 놓치는 상위 후보를 줄임)
+# recall_report(샘플 데이터 1000명, 200명 샘플) recall@10 / @50 / @100:
+#   그래프(차수 3, 여유 1.5) 0.80 / 0.71 / 0.83, 여유 3.0이면 @100 0.96
+#   그래프 없이 같은 성별 전체로 넓히면(기본, MATCH_GRAPH_DEGREE=0) 0.82 / 0.80 / 1.00 (대신 @100 후보 2.7배)
+GRAPH_MARGIN = 1.5
+
+
+# ======================
+# 중심점 근접 그래프
+# ======================
+class ClusterGraph:
+    """학습 시점에 클러스터마다 그래프 거리(ring)별 이웃 클러스터 목록을 미리 계산합니다.
+
+    rings[c][0]은 c와 직접 연결된 클러스터, rings[c][1]은 두 단계 떨어진 클러스터... (ring 안은 중심점 거리순).
+    그래프로 닿지 않는 클러스터는 마지막 ring에 거리순으로 붙으므로 끝까지 펼치면 같은 성별 전체가 됩니다.
+    """
+
+    def __init__(self, centroids, degree=GRAPH_DEGREE, margin=GRAPH_MARGIN):
+        centroids = np.asarray(centroids, dtype=np.float64)
+        n = len(centroids)
+        dists = ((centroids[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2)
+        order = np.argsort(dists, axis=1, kind="stable")
+        neighbours = [set() for _ in range(n)]
+        for c in range(n):
+            for other in order[c][order[c] != c][:degree]:
+                neighbours[c].add(int(other))
+                neighbours[int(other)].add(c)
+
+        self.degree = degree
+        self.margin = margin
+        self.rings = []
+        for c in range(n):
+            seen, frontier, rings = {c}, [c], []
+            while frontier:
+                ring = sorted({j for f in frontier for j in neighbours[f]} - seen, key=lambda j: dists[c, j])
+                if ring:
+                    rings.append(ring)
+                seen.update(ring)
+                frontier = ring
+            rest = [int(j) for j in order[c] if int(j) not in seen]
+            if rest:
+                rings.append(rest)
+            self.rings.append(rings)
+
+    def expand(self, index, target_cluster, student_id, need, constraint=None):
+        """타겟 클러스터만으로 need명이 안 되면 후보가 need × margin명 이상이 될 때까지 한 ring씩 넓힙니다"""
+        cluster_ids = [target_cluster]
+        if index.count(cluster_ids, student_id, constraint) >= need:
+            return cluster_ids
+        rings = self.rings[target_cluster] if 0 <= target_cluster < len(self.rings) else []
+        for ring in rings:
+            for c in ring:
+                if c not in index.blocks:
+                    continue
+                cluster_ids.append(c)
+                if index.count(cluster_ids, student_id, constraint) >= need * self.margin:
+                    return cluster_ids
+        return cluster_ids
+
+
+# ======================
+# 후보 검색 방식 (ANN 백엔드)
+# ======================
+class FullSearch:
+    """같은 성별 전체를 채점합니다 (정확한 코사인 top-k)"""
+    name = "full"
+
+    def candidate_clusters(self, centroids, index, target, target_cluster, student_id, need, constraint=None, graph=None):
+        return list(index.blocks)
+
+
+class ClusterSearch:
+    """같은 클러스터만 채점하고, 후보가 부족하면 같은 성별 전체를 채점합니다.
+
+    graph(중심점 근접 그래프)를 넘기면 같은 성별 전체 대신 가까운 클러스터를 하나씩 더합니다 (근사)
+    """
+    name = "cluster"
+
+    def candidate_clusters(self, centroids, index, target, target_cluster, student_id, need, constraint=None, graph=None):
+        if graph is not None:
+            return graph.expand(index, target_cluster, student_id, need, constraint)
+        cluster_ids = [target_cluster]
+        if index.count(cluster_ids, student_id, constraint) < need:
+            cluster_ids = list(index.blocks)
+        return cluster_ids
+
+
+class IVFSearch:
+    """KMeans 중심점을 역색인(IVF)으로 사용합니다.
+
+    타겟과 가까운 중심점 순으로 nprobe개 클러스터를 채점하고, 후보가 need명보다 적으면
+    다음으로 가까운 클러스터를 하나씩 더합니다. nprobe가 클수록 recall↑ / 지연시간↑
+    """
+    name = "ivf"
+
+    def __init__(self, nprobe=2):
+        self.nprobe = max(1, int(nprobe))
+
+    def candidate_clusters(self, centroids, index, target, target_cluster, student_id, need, constraint=None, graph=None):
+        dists = ((centroids - np.asarray(target, dtype=np.float64)) ** 2).sum(axis=1)
+        order = [int(c) for c in np.argsort(dists, kind="stable") if int(c) in index.blocks]
+        probe = order[:self.nprobe]
+        for cluster_id in order[self.nprobe:]:
+            if index.count(probe, student_id, constraint) >= need:
+                break
+            probe.append(cluster_id)
+        return probe
+
+
+SEARCH_BACKENDS = {
+    "full": FullSearch,
+    "cluster": ClusterSearch,
+    "ivf": IVFSearch,
+}
+
+
+def make_search(name, nprobe=2):
+    if name not in SEARCH_BACKENDS:
+        raise ValueError(f"알 수 없는 검색 방식: {name} (가능: {', '.join(SEARCH_BACKENDS)})")
+    if name == "ivf":
+        return IVFSearch(nprobe=nprobe)
+    return SEARCH_BACKENDS[name]()
+
+
+# ======================
+# recall@k 리포트
+# ======================
+def recall_report(engine, users, k=10, searches=None):
+    """같은 성별 전체를 정확히 채점한 top-k 대비 각 검색 방식의 recall@k와 평균 지연시간을 계산합니다.
+
+    동점이 많으므로 정답 k번째 점수 이상인 후보를 찾으면 적중으로 봅니다.
+    """
+    searches = searches or [engine.search]
+    vecs, clusters, words = engine.vectorize(users)
+
+    report = []
+    for search in searches:
+        hits, total, elapsed, scored = 0, 0, 0.0, 0
+        for user, vec, cluster_id, word in zip(users, vecs, clusters, words):
+            index = engine.gender_index.get(user['gender'])
+            if index is None:
+                continue
+            exact_sims, _ = index.score(vec, list(index.blocks), user['student_id'], word)
+            if len(exact_sims) == 0:
+                continue
+            kk = min(k, len(exact_sims))
+            threshold = np.partition(exact_sims, len(exact_sims) - kk)[len(exact_sims) - kk]
+
+            start = time.perf_counter()
+            cluster_ids = search.candidate_clusters(
+                engine.centroids, index, vec, int(cluster_id), user['student_id'], k, graph=engine.cluster_graph
+            )
+            sims, _ = index.score(vec, cluster_ids, user['student_id'], word)
+            top = np.sort(sims)[::-1][:kk]
+            elapsed += time.perf_counter() - start
+
+            hits += int((top >= threshold - 1e-6).sum())
+            total += kk
+            scored += len(sims)
+
+        n = max(1, len(users))
+        report.append({
+            "search": search.name,
+            "nprobe": getattr(search, "nprobe", None),
+            "k": k,
+            "recall": hits / total if total else None,
+            "avg_candidates": scored / n,
+            "avg_latency_ms": elapsed / n * 1000,
+        })
+    return report
+
+
+if __name__ == "__main__":
+    from .main import MATCH_GRAPH_DEGREE, MATCH_GRAPH_MARGIN, DormMatchAI_Server
+
+    parser = argparse.ArgumentParser(description="검색 방식별 recall@k / 지연시간 리포트")
+    parser.add_argument("--data", default="data/dormitory_users.json")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--sample", type=int, default=200)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 3, 4])
+    parser.add_argument("--graph-degree", type=int, default=MATCH_GRAPH_DEGREE, help=f"0이면 그래프 없이 같은 성별 전체로 넓힘 (그래프 사용 예: {GRAPH_DEGREE})")
+    parser.add_argument("--graph-margin", type=float, default=MATCH_GRAPH_MARGIN)
+    args = parser.parse_args()
+
+    engine = DormMatchAI_Server(args.data)
+    engine.load_and_train()
+    engine.cluster_graph = engine.build_cluster_graph(args.graph_degree, args.graph_margin)
+
+    with open(args.data, "r", encoding="utf-8") as f:
+        users = json.load(f)[:args.sample]
+    searches = [FullSearch(), ClusterSearch()] + [IVFSearch(nprobe=n) for n in args.nprobe]
+    for row in recall_report(engine, users, k=args.k, searches=searches):
+        print(json.dumps(row, ensure_ascii=False))
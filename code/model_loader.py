@@ -0,0 +1,92 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+LOAD_RETRIES = 3  # 실패 시 다시 시도하는 횟수
+LOAD_BACKOFF = 5  # 첫 재시도 전 대기(초), 시도마다 2배
+
+
+# ======================
+# 백그라운드 모델 로더
+# ======================
+class BackgroundLoader:
+    """모델 로드 함수를 백그라운드에서 실행하고 상태(pending/loading/ready/failed)와 소요 시간을 기록합니다.
+
+    in_process=False면 별도 프로세스(spawn)에서 실행해 순수 Python 시뮬레이션이 GIL을 잡고 있어도
+    API 응답이 느려지지 않습니다. 이 경우 fn과 반환값은 pickle 가능해야 합니다.
+    실패하면 retries번까지 backoff초(시도마다 2배) 뒤 다시 시도하고, 그래도 실패하면 failed로 남습니다.
+    """
+
+    def __init__(self, name, fn, on_ready=None, in_process=True, retries=LOAD_RETRIES, backoff=LOAD_BACKOFF):
+        self.name = name
+        self.fn = fn
+        self.on_ready = on_ready
+        self.in_process = in_process
+        self.retries = retries
+        self.backoff = backoff
+        self.attempts = 0
+        self.state = "pending"
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self.seconds = None
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.thread = threading.Thread(target=self.run, name=f"load-{self.name}", daemon=True)
+            self.thread.start()
+
+    def run(self):
+        self.state = "loading"
+        self.started_at = datetime.now().isoformat()
+        start = time.perf_counter()
+        print(f"⏳ [{self.name}] 백그라운드 로드 시작...")
+        delay = self.backoff
+        while True:
+            self.attempts += 1
+            try:
+                self.load()
+                self.state = "ready"
+                self.error = None
+                print(f"✅ [{self.name}] 로드 완료 ({time.perf_counter() - start:.1f}초)")
+                break
+            except Exception as e:
+                self.error = str(e) or type(e).__name__
+                if self.attempts > self.retries:
+                    self.state = "failed"
+                    print(f"❌ [{self.name}] 로드 실패: {e}")
+                    break
+                print(f"⚠️ [{self.name}] 로드 실패 ({self.attempts}/{self.retries + 1}): {e} - {delay}초 뒤 다시 시도")
+                time.sleep(delay)
+                delay *= 2
+        self.seconds = round(time.perf_counter() - start, 3)
+        self.finished_at = datetime.now().isoformat()
+
+    def load(self):
+        if self.in_process:
+            model = self.fn()
+        else:
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                model = pool.submit(self.fn).result()
+        if self.on_ready is not None:
+            self.on_ready(model)
+
+    @property
+    def ready(self):
+        return self.state == "ready"
+
+    def status(self):
+        return {
+            "state": self.state,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "load_seconds": self.seconds,
+            "attempts": self.attempts,
+            "error": self.error,
+        }
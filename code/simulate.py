@@ -1,15 +1,13 @@
-import random
+import argparse
+import heapq
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
 from datetime import date
 
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import classification_report
-from sklearn.neural_network import MLPClassifier
-from sklearn.preprocessing import StandardScaler
-from sklearn.pipeline import Pipeline
-
 # ======================
 # 파라미터
 # ======================
@@ -18,6 +16,7 @@ MINUTES = SIM_DAYS * 24 * 60
 
 MEN_POP = 358
 WOMEN_POP = 358
+ROOMS = {"men": MEN_POP, "women": WOMEN_POP}
 
 WASHERS = 10
 DRYERS = 5
@@ -39,87 +38,212 @@ MAX_DRY_QUEUE = 10
 P_BAIL_BASE = 0.05
 P_BAIL_PER_PERSON = 0.02
 
+# 앙상블(몬테카를로) 시뮬레이션
+ENSEMBLE_REPLICAS = 32
+ENSEMBLE_PERCENTILES = (10, 50, 90)
+
 # ======================
 # 유틸 함수
 # ======================
-def wash_duration():
-    return max(10, int(random.gauss(WASH_TIME_MEAN, WASH_TIME_SD)))
+def wash_duration(rng, n=None):
+    return np.maximum(10, np.trunc(rng.normal(WASH_TIME_MEAN, WASH_TIME_SD, n))).astype(np.int64)
 
-def dry_duration():
-    return max(20, int(random.gauss(DRY_TIME_MEAN, DRY_TIME_SD)))
+def dry_duration(rng, n=None):
+    return np.maximum(20, np.trunc(rng.normal(DRY_TIME_MEAN, DRY_TIME_SD, n))).astype(np.int64)
 
-def forget_duration():
-    return max(0, int(random.gauss(FORGET_TIME_MEAN, FORGET_TIME_SD)))
+def forget_duration(rng, n=None):
+    return np.maximum(0, np.trunc(rng.normal(FORGET_TIME_MEAN, FORGET_TIME_SD, n))).astype(np.int64)
 
 def peak_weight(minute):
-    hour = (minute // 60) % 24
-    if hour < 18 or hour > 23:
-        return 1.0
+    hour = (np.asarray(minute) // 60) % 24
     x = (hour - 18) / 5.0
-    return 1.0 + PEAK_MULTIPLIER * np.exp(-((x - 0.5) ** 2) / 0.08)
+    weight = 1.0 + PEAK_MULTIPLIER * np.exp(-((x - 0.5) ** 2) / 0.08)
+    return np.where((hour < 18) | (hour > 23), 1.0, weight)
 
 # ======================
-# 시뮬레이션
+# 시뮬레이션 (이산 사건)
 # ======================
-def simulate(room, pop):
-    washers = [0] * WASHERS
-    dryers = [0] * DRYERS
-
-    wash_queue = 0
-    dry_queue = 0
-    records = []
-
+def machine_durations(rng, n, duration):
+    """기계 n회 사용분의 점유 시간 (기본 시간 + P_FORGET 확률로 안 꺼내 가는 시간)"""
+    forgot = rng.random(n) < P_FORGET
+    return duration(rng, n) + np.where(forgot, forget_duration(rng, n), 0)
+
+def simulate_state(pop, seed=None):
+    """도착 / 세탁기 종료 / 건조기 종료 사건만 처리하는 이산 사건 시뮬레이션.
+
+    분 단위 루프와 같은 순서(도착 → 세탁 종료 → 건조 종료 → 이탈 → 세탁 시작 → 건조 시작)로 사건이 있는 분만 처리하고,
+    다음 사건까지는 상태가 그대로이므로 사건 시각별 상태만 모았다가 마지막에 분 단위 배열로 펼칩니다.
+    건조 대기열이 MAX_DRY_QUEUE를 넘는 동안은 매분 이탈 인원을 이항분포로 뽑습니다.
+    """
+    rng = np.random.default_rng(seed)
+    minutes = np.arange(MINUTES)
     daily_arrivals = (pop * WASHES_PER_PERSON_PER_WEEK) / 7.0
     base_arrival_prob = daily_arrivals / (24 * 60)
-
-    for t in range(MINUTES):
-        day = t // 1440
-        hour = (t // 60) % 24
-        day_of_week = day % 7          # ✅ 추가
-        is_weekend = 1 if day_of_week >= 5 else 0
-
-        if random.random() < base_arrival_prob * peak_weight(t):
+    arrivals = np.flatnonzero(rng.random(MINUTES) < base_arrival_prob * peak_weight(minutes)).tolist()
+
+    # 기계 사용 횟수는 도착 수를 넘지 않으므로 점유 시간을 한 번에 뽑아 둠
+    wash_times = machine_durations(rng, len(arrivals), wash_duration).tolist()
+    dry_times = machine_durations(rng, len(arrivals), dry_duration).tolist()
+    n_washed = n_dried = 0
+
+    washers, dryers = [], []  # 사용 중인 기계의 종료 시각 (heap)
+    wash_queue = dry_queue = 0
+    bailed = 0
+    next_arrival = 0
+    arrivals.append(MINUTES)  # 보초값
+    # 사건 시각별 상태 (다음 사건 시각까지 유지) - 0분부터 첫 사건 전까지는 빈 상태
+    times, states = [0], [(0, 0, 0, 0)]
+
+    t = arrivals[0]
+    while t < MINUTES:
+        while arrivals[next_arrival] == t:
             wash_queue += 1
+            next_arrival += 1
 
-        for i in range(WASHERS):
-            if washers[i] > 0:
-                washers[i] -= 1
-                if washers[i] == 0 and random.random() < P_USE_DRYER_AFTER_WASH:
-                    dry_queue += 1
+        finished = 0
+        while washers and washers[0] == t:
+            heapq.heappop(washers)
+            finished += 1
+        if finished:
+            dry_queue += int(rng.binomial(finished, P_USE_DRYER_AFTER_WASH))
 
-        for i in range(DRYERS):
-            if dryers[i] > 0:
-                dryers[i] -= 1
+        while dryers and dryers[0] == t:
+            heapq.heappop(dryers)
 
         if dry_queue > MAX_DRY_QUEUE:
             excess = dry_queue - MAX_DRY_QUEUE
             bail_prob = min(P_BAIL_BASE + excess * P_BAIL_PER_PERSON, 0.9)
-            bailed = sum(1 for _ in range(dry_queue) if random.random() < bail_prob)
-            dry_queue = max(0, dry_queue - bailed)
-
-        for i in range(WASHERS):
-            if washers[i] == 0 and wash_queue > 0:
-                wash_queue -= 1
-                washers[i] = wash_duration()
-                if random.random() < P_FORGET:
-                    washers[i] += forget_duration()
-
-        for i in range(DRYERS):
-            if dryers[i] == 0 and dry_queue > 0:
-                dry_queue -= 1
-                dryers[i] = dry_duration()
-                if random.random() < P_FORGET:
-                    dryers[i] += forget_duration()
-
-        records.append({
-            "hour": hour,
-            "day_of_week": day_of_week,   # ✅ 추가
-            "is_weekend": is_weekend,
-            "running_washers": sum(w > 0 for w in washers),
-            "room": room
-        })
+            left = int(rng.binomial(dry_queue, bail_prob))
+            dry_queue -= left
+            bailed += left
+
+        while wash_queue and len(washers) < WASHERS:
+            heapq.heappush(washers, t + wash_times[n_washed])
+            n_washed += 1
+            wash_queue -= 1
+
+        while dry_queue and len(dryers) < DRYERS:
+            heapq.heappush(dryers, t + dry_times[n_dried])
+            n_dried += 1
+            dry_queue -= 1
+
+        times.append(t)
+        states.append((len(washers), len(dryers), wash_queue, dry_queue))
+        t = min(
+            arrivals[next_arrival],
+            washers[0] if washers else MINUTES,
+            dryers[0] if dryers else MINUTES,
+            t + 1 if dry_queue > MAX_DRY_QUEUE else MINUTES,
+        )
+
+    # 사건 사이 구간 길이만큼 반복해 분 단위 배열로 펼침
+    lengths = np.diff(np.append(times, MINUTES))
+    values = np.repeat(np.array(states, dtype=np.int16), lengths, axis=0)
+    state = {
+        name: np.ascontiguousarray(values[:, i])
+        for i, name in enumerate(("running_washers", "running_dryers", "wash_queue", "dry_queue"))
+    }
+    state["arrivals"] = len(arrivals) - 1
+    state["bailed"] = bailed
+    return state
+
+def simulate(room, pop, seed=None, output="minutes"):
+    """output="minutes"면 기존과 같은 분 단위 DataFrame(hour, day_of_week, is_weekend, running_washers, room),
+    "state"면 분 단위 상태 배열 dict를 반환합니다"""
+    state = simulate_state(pop, seed)
+    if output == "state":
+        return state
+    if output != "minutes":
+        raise ValueError(f"알 수 없는 output: {output} (가능: minutes, state)")
+
+    minutes = np.arange(MINUTES)
+    day_of_week = (minutes // 1440) % 7
+    return pd.DataFrame({
+        "hour": (minutes // 60) % 24,
+        "day_of_week": day_of_week,
+        "is_weekend": (day_of_week >= 5).astype(np.int64),
+        "running_washers": state["running_washers"].astype(np.int64),
+        "room": room,
+    })
 
-    return pd.DataFrame(records)
+# ======================
+# 앙상블 시뮬레이션 (몬테카를로)
+# ======================
+def occupancy_histogram(running_washers):
+    """분 단위 가동 세탁기 수 -> (요일 7, 시간 24, 가동 대수 0..WASHERS) 분 수 히스토그램"""
+    minutes = np.arange(MINUTES)
+    cell = ((minutes // 1440) % 7) * 24 + (minutes // 60) % 24
+    counts = np.bincount(cell * (WASHERS + 1) + running_washers, minlength=7 * 24 * (WASHERS + 1))
+    return counts.reshape(7, 24, WASHERS + 1)
+
+def run_replica(room, pop, seed):
+    """복제 1회 (프로세스 풀 작업 단위)"""
+    return room, occupancy_histogram(simulate_state(pop, seed)["running_washers"])
+
+def simulate_ensemble(replicas=ENSEMBLE_REPLICAS, seed=None, workers=None, rooms=None):
+    """방마다 독립 복제 replicas회를 프로세스 풀에서 돌려 (요일, 시간)별 히스토그램을 합칩니다.
+
+    복제마다 SeedSequence에서 나눈 별도 Generator를 쓰므로 같은 seed면 워커 수와 관계없이 결과가 같습니다.
+    반환: {room: (7, 24, WASHERS + 1) 분 수 히스토그램}
+    """
+    rooms = rooms or ROOMS
+    tasks = [(room, pop) for room, pop in rooms.items() for _ in range(replicas)]
+    seeds = np.random.SeedSequence(seed).spawn(len(tasks))
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks)))
+
+    hists = {room: np.zeros((7, 24, WASHERS + 1), dtype=np.int64) for room in rooms}
+    if workers == 1:
+        results = (run_replica(room, pop, ss) for (room, pop), ss in zip(tasks, seeds))
+        for room, hist in results:
+            hists[room] += hist
+        return hists
+
+    task_rooms, task_pops = zip(*tasks)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        for room, hist in pool.map(run_replica, task_rooms, task_pops, seeds, chunksize=max(1, len(tasks) // (workers * 4))):
+            hists[room] += hist
+    return hists
+
+def histogram_percentile(hist, q):
+    """히스토그램(마지막 축)에서 q 백분위 가동 대수"""
+    cdf = np.cumsum(hist, axis=-1)
+    return (cdf < cdf[..., -1:] * (q / 100.0)).sum(axis=-1)
+
+def ensemble_table(hists, percentiles=ENSEMBLE_PERCENTILES):
+    """(room, 요일, 시간)별 평균 / 백분위 가동 세탁기 수와 혼잡도 등급 비율"""
+    values = np.arange(WASHERS + 1)
+    labels = np.array([label_congestion(v) for v in values])
+    frames = []
+    for room, hist in hists.items():
+        total = hist.sum(axis=-1)
+        day_of_week, hour = np.meshgrid(np.arange(7), np.arange(24), indexing="ij")
+        frame = {
+            "room": room,
+            "day_of_week": day_of_week.ravel(),
+            "hour": hour.ravel(),
+            "is_weekend": (day_of_week.ravel() >= 5).astype(np.int64),
+            "minutes": total.ravel(),
+            "mean_running": ((hist * values).sum(axis=-1) / np.maximum(total, 1)).ravel(),
+        }
+        for q in percentiles:
+            frame[f"p{q}_running"] = histogram_percentile(hist, q).ravel()
+        for c in range(labels.max() + 1):
+            frame[f"p_congestion_{c}"] = (hist[..., labels == c].sum(axis=-1) / np.maximum(total, 1)).ravel()
+        frames.append(pd.DataFrame(frame))
+    return pd.concat(frames, ignore_index=True)
+
+def ensemble_training_frame(hists, n_rows, seed=None):
+    """합친 히스토그램에서 (시간, 요일, 주말, 혼잡도) 학습 행 n_rows개를 뽑습니다 (한 달치 한 번보다 잡음이 적음)"""
+    rng = np.random.default_rng(seed)
+    counts = np.stack(list(hists.values())).ravel()
+    picks = rng.choice(len(counts), size=n_rows, p=counts / counts.sum())
+    _, day_of_week, hour, running = np.unravel_index(picks, (len(hists), 7, 24, WASHERS + 1))
+    return pd.DataFrame({
+        "hour": hour,
+        "day_of_week": day_of_week,
+        "is_weekend": (day_of_week >= 5).astype(np.int64),
+        "running_washers": running,
+    })
 
 # ======================
 # 혼잡도 라벨링
@@ -138,13 +262,40 @@ def label_congestion(running):
 # ======================
 # 모델 초기화 및 학습
 # ======================
-def train_model():
-    print("▶ 시뮬레이션 중...")
-    df = pd.concat([
-        simulate("men", MEN_POP),
-        simulate("women", WOMEN_POP)
-    ], ignore_index=True)
+def simulation_params():
+    """저장된 모델이 지금 시뮬레이션 설정으로 학습된 것인지 확인하는 데 쓰는 파라미터 목록"""
+    names = [
+        "SIM_DAYS", "MEN_POP", "WOMEN_POP", "WASHERS", "DRYERS",
+        "WASHES_PER_PERSON_PER_WEEK", "PEAK_MULTIPLIER",
+        "WASH_TIME_MEAN", "WASH_TIME_SD", "DRY_TIME_MEAN", "DRY_TIME_SD",
+        "P_USE_DRYER_AFTER_WASH", "P_FORGET", "FORGET_TIME_MEAN", "FORGET_TIME_SD",
+        "MAX_DRY_QUEUE", "P_BAIL_BASE", "P_BAIL_PER_PERSON",
+    ]
+    return {name: globals()[name] for name in names}
+
+def training_frame(replicas=None, seed=None, workers=None):
+    """replicas를 주면 앙상블 히스토그램에서 뽑은 행으로, 아니면 방마다 시뮬레이션 한 번으로 학습 데이터를 만듭니다"""
+    if replicas:
+        print(f"▶ 앙상블 시뮬레이션 중 (방마다 {replicas}회)...")
+        hists = simulate_ensemble(replicas, seed=seed, workers=workers)
+        df = ensemble_training_frame(hists, MINUTES * len(ROOMS), seed=seed)
+    else:
+        print("▶ 시뮬레이션 중...")
+        room_seeds = np.random.SeedSequence(seed).spawn(len(ROOMS))
+        df = pd.concat([
+            simulate(room, pop, seed=ss) for (room, pop), ss in zip(ROOMS.items(), room_seeds)
+        ], ignore_index=True)
     df["congestion"] = df["running_washers"].apply(label_congestion)
+    return df
+
+def fit_model(df):
+    """(학습된 파이프라인, classification_report dict)"""
+    # sklearn은 여기서만 import (앙상블 워커 프로세스가 시뮬레이션만 할 때 import 시간을 줄임)
+    from sklearn.model_selection import train_test_split
+    from sklearn.metrics import classification_report
+    from sklearn.neural_network import MLPClassifier
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.pipeline import Pipeline
     
     X = df[["hour", "day_of_week", "is_weekend"]]
     y = df["congestion"]
@@ -168,19 +319,51 @@ def train_model():
     print("▶ 모델 학습 중 (MLP)...")
     model.fit(X_train, y_train)
     
+    y_pred = model.predict(X_test)
     print("\n▶ 평가 결과")
-    print(classification_report(y_test, model.predict(X_test)))
+    print(classification_report(y_test, y_pred, zero_division=0))
     
+    return model, classification_report(y_test, y_pred, zero_division=0, output_dict=True)
+
+def train_model(replicas=None, seed=None, workers=None):
+    model, _ = fit_model(training_frame(replicas, seed, workers))
     return model
 
+def train_artifact(replicas=None, seed=None, workers=None):
+    """(모델, 저장용 메타데이터) - 시뮬레이션 파라미터 / seed / 평가 결과 포함"""
+    start = time.perf_counter()
+    df = training_frame(replicas, seed, workers)
+    model, report = fit_model(df)
+    meta = {
+        "params": simulation_params(),
+        "seed": seed,
+        "replicas": replicas,
+        "train_rows": len(df),
+        "train_seconds": round(time.perf_counter() - start, 3),
+        "classification_report": report,
+    }
+    return model, meta
+
 # 모듈 레벨 변수 (lazy loading)
 model = None
 
 def get_model():
-    """모델을 lazy loading으로 가져옵니다"""
+    """저장된 모델이 있고 지금 설정/라이브러리 버전과 맞으면 불러오고, 없으면 학습해서 저장합니다"""
+    # 아티팩트 모듈은 joblib/sklearn을 불러오므로 여기서 import (앙상블 워커는 필요 없음)
+    from .laundry_artifacts import LAUNDRY_MODEL_PATH, load_laundry_model, save_laundry_model
+    
     global model
     if model is None:
-        model = train_model()
+        loaded = load_laundry_model(LAUNDRY_MODEL_PATH, simulation_params())
+        if loaded is not None:
+            model, meta = loaded
+            print(f"✅ 저장된 세탁실 모델 사용 ({meta['created_at']}) - 학습 생략")
+        else:
+            model, meta = train_artifact()
+            try:
+                save_laundry_model(LAUNDRY_MODEL_PATH, model, meta)
+            except OSError as e:
+                print(f"⚠️ 세탁실 모델 저장 실패: {e}")
     return model
 
 # ======================
@@ -203,10 +386,45 @@ def predict_day(model, target_date: date):
     X_pred["predicted_congestion"] = preds
     return X_pred
 
+class CongestionForecast:
+    """모델 입력은 (시간, 요일, 주말)뿐이므로 요일 7 × 시간 24 = 168칸의 등급별 확률을 한 번에 예측해 둡니다"""
+
+    def __init__(self, model):
+        day_of_week, hour = np.meshgrid(np.arange(7), np.arange(24), indexing="ij")
+        X = pd.DataFrame({
+            "hour": hour.ravel(),
+            "day_of_week": day_of_week.ravel(),
+            "is_weekend": (day_of_week.ravel() >= 5).astype(np.int64),
+        })
+        self.model = model
+        self.classes = [int(c) for c in model.classes_]
+        self.probabilities = model.predict_proba(X).reshape(7, 24, len(self.classes))
+        self.predicted = np.asarray(self.classes)[self.probabilities.argmax(axis=2)]
+
 # ======================
 # 4️⃣ UI 출력용
 # ======================
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="세탁실 시뮬레이션 / 혼잡도 모델")
+    sub = parser.add_subparsers(dest="command")
+    p_ens = sub.add_parser("ensemble", help="몬테카를로 앙상블로 (방, 요일, 시간)별 가동 세탁기 분포 계산")
+    p_ens.add_argument("--replicas", type=int, default=ENSEMBLE_REPLICAS)
+    p_ens.add_argument("--seed", type=int, default=0)
+    p_ens.add_argument("--workers", type=int, default=None)
+    p_ens.add_argument("--out", default=None, help="CSV 저장 경로 (없으면 요약만 출력)")
+    args = parser.parse_args()
+
+    if args.command == "ensemble":
+        start = time.perf_counter()
+        table = ensemble_table(simulate_ensemble(args.replicas, seed=args.seed, workers=args.workers))
+        print(f"✅ 방마다 {args.replicas}회 시뮬레이션 완료 ({time.perf_counter() - start:.1f}초)")
+        if args.out:
+            table.to_csv(args.out, index=False)
+            print(f"✅ 결과 저장: {args.out}")
+        else:
+            print(table.groupby(["room", "hour"])[["mean_running", "p90_running"]].mean().round(2).unstack("room").to_string())
+        raise SystemExit(0)
+
     m = get_model()
     result = predict_day(m, date(2025, 12, 23))
     peak_hour = result.loc[result["predicted_congestion"].idxmax(), "hour"]
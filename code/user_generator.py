@@ -0,0 +1,158 @@
+import argparse
+import json
+import time
+
+import numpy as np
+
+from .user_store import write_user_store_chunks
+
+# ======================
+# 더미 유저 생성 (model/[2025_2_해커톤]유저_더미데이터_생성.py 와 같은 분포)
+# ======================
+MAJORS = [
+    "국어국문학과", "국제학부", "역사학과", "교육학과", "글로벌인재학부",
+    "행정학과", "미디어커뮤니케이션학과", "법학과",
+    "경영학부", "경제학과",
+    "호텔관광외식경영학부", "호텔외식관광프랜차이즈경영학과", "글로벌조리학과", "호텔외식비즈니스학과",
+    "수학통계학과", "물리천문학과", "화학과",
+    "생명시스템학부", "스마트생명산업융합학과",
+    "AI융합전자공학과", "반도체시스템공학과", "컴퓨터공학과", "정보보호학과", "양자지능정보학과", "창의소프트학부", "지능IoT학과",
+    "사이버국방학과", "국방AI로봇융합공학과", "인공지능데이터사이언스학과", "AI로봇학과", "지능정보융합학과", "콘텐츠소프트웨어학과",
+    "건축공학과", "건축학과", "건설환경공학과", "환경융합공학과", "지구자원시스템공학과", "기계공학과",
+    "우주항공시스템공학부", "나노신소재공학과", "양자원자력공학과", "국방시스템공학과",
+    "회화과", "패션디자인학과", "음악과", "체육학과", "무용과", "영화예술학과",
+    "자유전공학부", "인문사회계열", "경상호텔관광계열", "자연생명계열", "IT계열", "첨단융합계열", "공과계열"
+]
+GENDERS = ['남성', '여성']
+
+YEARS = np.array([26, 25, 24, 23, 22, 21, 20])
+YEAR_WEIGHTS = np.array([30, 25, 15, 12, 8, 6, 4]) / 100
+AGE_VARIATION = np.array([-1, 0, 0, 1, 1, 2])
+NOISE = 0.1  # 10% 확률로 예외 행동
+SENSITIVE_COLS = ['out_return', 'other_seat_tol', 'phone_noise', 'light_sensitivity', 'key_mouse_noise', 'space_privacy']
+BOOL_COLS = ['is_smoker', 'wants_smoker', 'is_drinker', 'wants_drinker', 'sensitive_heat', 'sensitive_cold']
+GENERATE_CHUNK = 100_000
+
+# 학번 뒷자리: 학번 연도별 순번을 (순번 * ID_MULTIPLIER + ID_OFFSET * 연도번호) mod 10^width 로 섞음.
+# 곱하는 수가 10과 서로소라 같은 연도 안에서 겹치지 않으므로 재시도 루프가 필요 없음
+ID_MULTIPLIER = 7919
+ID_OFFSET = 1237
+
+
+def id_width(total_users):
+    """연도별 인원이 전부 들어갈 만큼의 학번 뒷자리 수 (최소 4자리)"""
+    return max(4, len(str(max(total_users - 1, 0))))
+
+
+def generate_columns(rng, n, year_counts, width):
+    """n명 분량의 컬럼 dict. year_counts(연도별 지금까지 발급한 학번 수)는 호출 사이에 이어집니다"""
+    def axis():
+        return rng.integers(0, 2, n, dtype=np.int8)
+
+    def noisy(value):
+        return (value ^ (rng.random(n) < NOISE)).astype(np.int8)
+
+    year_idx = rng.choice(len(YEARS), size=n, p=YEAR_WEIGHTS)
+    serial = np.empty(n, dtype=np.int64)
+    for i in range(len(YEARS)):
+        sel = np.flatnonzero(year_idx == i)
+        serial[sel] = year_counts[i] + np.arange(len(sel))
+        year_counts[i] += len(sel)
+    suffix = (serial * ID_MULTIPLIER + ID_OFFSET * (year_idx + 1)) % (10 ** width)
+    years = YEARS[year_idx]
+    student_ids = np.char.add(np.char.add(years.astype("S2"), b"01"), np.char.zfill(suffix.astype(f"S{width}"), width))
+
+    t_axis, h_axis, s_axis, o_axis = axis(), axis(), axis(), axis()
+    h_val, s_val = 1 - h_axis, 1 - s_axis
+
+    columns = {
+        'student_id': student_ids,
+        'age': np.clip((26 - years) + 21 + rng.choice(AGE_VARIATION, n), 20, 27).astype(np.int16),
+        'gender': rng.integers(0, len(GENDERS), n).astype(np.int8),
+        'major': rng.integers(0, len(MAJORS), n).astype(np.int8),
+    }
+    for col in BOOL_COLS:
+        columns[col] = rng.random(n) < 0.5
+    columns.update({
+        'sleep_habit': noisy(t_axis),
+        'wake_up': noisy(1 - t_axis),
+        'activity_time': noisy(t_axis),
+        'clean_immediate': noisy(h_val),
+        'desk_status': noisy(h_val),
+        'clean_cycle': (2 * h_axis + rng.integers(0, 2, n)).astype(np.int8),
+        **{col: noisy(s_val) for col in SENSITIVE_COLS},
+        'alarm_habit': noisy(s_val),
+        'social_willingness': noisy(o_axis),
+        'friend_invite': noisy(o_axis),
+        'dorm_stay': noisy(1 - o_axis),
+    })
+    return columns
+
+
+def iter_user_chunks(total_users, seed=None, chunk_size=GENERATE_CHUNK):
+    """total_users명을 chunk_size명씩 컬럼 dict로 만들어 냅니다 (같은 seed면 같은 결과)"""
+    rng = np.random.default_rng(seed)
+    year_counts = [0] * len(YEARS)
+    width = id_width(total_users)
+    for start in range(0, total_users, chunk_size):
+        yield generate_columns(rng, min(chunk_size, total_users - start), year_counts, width)
+
+
+VOCAB = {"gender": GENDERS, "major": MAJORS}
+
+
+def chunk_records(columns):
+    """컬럼 dict 청크 -> 레코드(dict) 목록"""
+    values = {}
+    for name, column in columns.items():
+        if name in VOCAB:
+            values[name] = np.array(VOCAB[name], dtype=object)[column].tolist()
+        elif column.dtype.kind == "S":
+            values[name] = np.char.decode(column, "ascii").tolist()
+        else:
+            values[name] = column.tolist()
+    names = list(values)
+    return [dict(zip(names, row)) for row in zip(*values.values())]
+
+
+def create_mock_users(total_users, seed=None):
+    """작은 풀용: 레코드 목록으로 반환"""
+    users = []
+    for columns in iter_user_chunks(total_users, seed):
+        users.extend(chunk_records(columns))
+    return users
+
+
+def write_jsonl(path, total_users, seed=None, chunk_size=GENERATE_CHUNK):
+    with open(path, "w", encoding="utf-8") as f:
+        for columns in iter_user_chunks(total_users, seed, chunk_size):
+            f.write("\n".join(json.dumps(record, ensure_ascii=False) for record in chunk_records(columns)))
+            f.write("\n")
+
+
+def write_store(path, total_users, seed=None, chunk_size=GENERATE_CHUNK):
+    """컬럼형 유저 저장소(user_store 형식)로 바로 씁니다"""
+    width = id_width(total_users)
+    probe = generate_columns(np.random.default_rng(0), 1, [0] * len(YEARS), width)
+    dtypes = {name: column.dtype for name, column in probe.items()}
+    return write_user_store_chunks(
+        path, total_users, dtypes, VOCAB, iter_user_chunks(total_users, seed, chunk_size),
+        source=f"user_generator(n={total_users}, seed={seed})"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="더미 유저 데이터 생성 (NumPy 벡터화, 청크 단위 저장)")
+    parser.add_argument("--n", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--format", choices=["jsonl", "store"], default="jsonl")
+    parser.add_argument("--chunk", type=int, default=GENERATE_CHUNK)
+    parser.add_argument("--out", default="dormitory_users.jsonl")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.format == "store":
+        write_store(args.out, args.n, seed=args.seed, chunk_size=args.chunk)
+    else:
+        write_jsonl(args.out, args.n, seed=args.seed, chunk_size=args.chunk)
+    print(f"✅ 총 {args.n}명의 데이터를 생성하여 '{args.out}'로 저장했습니다. ({time.perf_counter() - start:.1f}초)")
@@ -0,0 +1,451 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+# ======================
+# 컬럼형 유저 저장소
+# ======================
+# 필드별 저장 형식: id(고정폭 문자열) / category(코드 + 사전) / bool / 정수 dtype
+USER_FIELDS = {
+    "student_id": "id",
+    "age": "int16",
+    "gender": "category",
+    "major": "category",
+    "is_smoker": "bool",
+    "wants_smoker": "bool",
+    "is_drinker": "bool",
+    "wants_drinker": "bool",
+    "sensitive_heat": "bool",
+    "sensitive_cold": "bool",
+    "sleep_habit": "int8",
+    "wake_up": "int8",
+    "activity_time": "int8",
+    "clean_immediate": "int8",
+    "desk_status": "int8",
+    "clean_cycle": "int8",
+    "out_return": "int8",
+    "other_seat_tol": "int8",
+    "phone_noise": "int8",
+    "light_sensitivity": "int8",
+    "key_mouse_noise": "int8",
+    "space_privacy": "int8",
+    "alarm_habit": "int8",
+    "social_willingness": "int8",
+    "friend_invite": "int8",
+    "dorm_stay": "int8",
+}
+STORE_VERSION = 1
+USER_STORE_PATH = "data/users.store"
+IMPORT_CHUNK = 65536
+READ_SIZE = 1 << 20
+
+
+def is_user_store(path):
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, "meta.json"))
+
+
+def read_meta(path):
+    with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def fingerprint(path):
+    """저장소는 내용 해시(meta.json)를, 일반 파일은 파일 해시를 반환합니다"""
+    if is_user_store(path):
+        return read_meta(path)["sha256"]
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(READ_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def data_signature(path):
+    """변경 감지용 가벼운 서명: 저장소는 내용 해시(+ 원본 파일 서명), 일반 파일은 크기 + 수정 시각 (없으면 None)"""
+    try:
+        if is_user_store(path):
+            meta = read_meta(path)
+            source = meta.get("source")
+            # 원본 JSON이 바뀌어도 서명이 달라지도록 원본 파일의 크기/수정 시각을 붙임
+            if source and os.path.isfile(source):
+                return f"{meta['sha256']}:{data_signature(source)}"
+            return meta["sha256"]
+        stat = os.stat(path)
+    except (OSError, ValueError, KeyError):
+        return None
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def is_stale_store(path):
+    """저장소를 만든 원본 파일이 남아 있고, 그 해시가 meta에 기록된 값과 다르면 True"""
+    meta = read_meta(path)
+    source = meta.get("source")
+    if not source or not os.path.isfile(source):
+        return False
+    return meta.get("source_sha256") != fingerprint(source)
+
+
+# ======================
+# 스트리밍 JSON / JSONL 읽기
+# ======================
+def iter_records(path):
+    """JSON 배열([...]) 또는 JSONL 파일을 전체를 메모리에 올리지 않고 레코드 단위로 읽습니다"""
+    with open(path, "r", encoding="utf-8") as f:
+        head = f.read(READ_SIZE)
+        if head.lstrip().startswith("["):
+            yield from iter_json_array(f, head)
+        else:
+            yield from iter_json_lines(f, head)
+
+
+def iter_json_lines(f, head):
+    buf = head
+    while True:
+        *lines, buf = buf.split("\n")
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+        chunk = f.read(READ_SIZE)
+        if not chunk:
+            break
+        buf += chunk
+    if buf.strip():
+        yield json.loads(buf)
+
+
+def iter_json_array(f, head):
+    decoder = json.JSONDecoder()
+    buf = head[head.index("[") + 1:]
+    pos, eof = 0, False
+    while True:
+        while pos < len(buf) and buf[pos] in " \t\r\n,":
+            pos += 1
+        if pos < len(buf) and buf[pos] == "]":
+            return
+        try:
+            if pos >= len(buf):
+                raise json.JSONDecodeError("incomplete", buf, pos)
+            record, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            chunk = f.read(READ_SIZE)
+            eof = not chunk
+            buf = buf[pos:] + chunk
+            pos = 0
+            continue
+        yield record
+        pos = end
+
+
+# ======================
+# 컬럼 빌더
+# ======================
+class ColumnBuilder:
+    """레코드를 IMPORT_CHUNK개씩 모아 필드별 NumPy 배열로 변환합니다. 필수 필드가 없는 레코드는 건너뜁니다"""
+
+    def __init__(self, required, fields=USER_FIELDS):
+        self.fields = fields
+        self.required = list(required)
+        self.vocab = {name: {} for name, kind in fields.items() if kind == "category"}
+        self.pending = {name: [] for name in fields}
+        self.chunks = {name: [] for name in fields}
+        self.total = 0
+        self.valid = 0
+
+    def add(self, record):
+        self.total += 1
+        if not all(field in record for field in self.required):
+            return False
+        try:
+            row = {name: self.convert(name, kind, record.get(name)) for name, kind in self.fields.items()}
+        except (TypeError, ValueError):
+            return False
+        for name, value in row.items():
+            self.pending[name].append(value)
+        self.valid += 1
+        if len(self.pending["student_id"]) >= IMPORT_CHUNK:
+            self.flush()
+        return True
+
+    def convert(self, name, kind, value):
+        if kind == "id":
+            return "" if value is None else str(value)
+        if kind == "category":
+            value = "" if value is None else str(value)
+            codes = self.vocab[name]
+            if value not in codes:
+                codes[value] = len(codes)
+            return codes[value]
+        if value is None:
+            return 0
+        return bool(value) if kind == "bool" else int(value)
+
+    def flush(self):
+        for name, kind in self.fields.items():
+            values = self.pending[name]
+            if not values:
+                continue
+            if kind == "id":
+                self.chunks[name].append(np.array(values, dtype=object))
+            elif kind == "category":
+                self.chunks[name].append(np.array(values, dtype=np.int32))
+            else:
+                self.chunks[name].append(np.array(values, dtype=kind))
+            self.pending[name] = []
+
+    def finish(self):
+        """(컬럼 dict, 카테고리 사전) - category 컬럼은 코드, id 컬럼은 고정폭 문자열"""
+        self.flush()
+        columns, vocab = {}, {}
+        for name, kind in self.fields.items():
+            chunks = self.chunks[name]
+            if kind == "id":
+                ids = np.concatenate(chunks) if chunks else np.empty(0, dtype=object)
+                ascii_only = all(s.isascii() for s in ids)
+                columns[name] = ids.astype(bytes) if ascii_only and len(ids) else ids.astype(str)
+            elif kind == "category":
+                labels = list(self.vocab[name])
+                vocab[name] = labels
+                codes = np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int32)
+                columns[name] = codes.astype(np.int8 if len(labels) < 128 else np.int32)
+            else:
+                columns[name] = np.concatenate(chunks) if chunks else np.empty(0, dtype=kind)
+        return columns, vocab
+
+
+def import_records(path, required):
+    """JSON/JSONL 파일 -> (컬럼 dict, 카테고리 사전, 전체 레코드 수)"""
+    builder = ColumnBuilder(required)
+    for record in iter_records(path):
+        builder.add(record)
+    columns, vocab = builder.finish()
+    return columns, vocab, builder.total
+
+
+# ======================
+# 저장 / 로드
+# ======================
+def write_user_store(out, columns, vocab, n_total, source=None):
+    """필드별 .npy + meta.json을 임시 폴더에 쓴 뒤 rename으로 교체합니다"""
+    n = len(columns["student_id"])
+    dtypes = {name: np.asarray(column).dtype for name, column in columns.items()}
+    return write_user_store_chunks(out, n, dtypes, vocab, [columns], n_total, source)
+
+
+def write_user_store_chunks(out, n, dtypes, vocab, chunks, n_total=None, source=None):
+    """컬럼 dict 청크들을 미리 크기를 잡은 .npy(memmap)에 차례로 채웁니다. 메모리는 청크 하나만큼만 사용"""
+    parent = os.path.dirname(os.path.abspath(out))
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=".users-", dir=parent)
+    try:
+        files = {
+            name: np.lib.format.open_memmap(os.path.join(tmp, f"{name}.npy"), mode="w+", dtype=dtype, shape=(n,))
+            for name, dtype in dtypes.items()
+        }
+        offset = 0
+        for chunk in chunks:
+            size = len(chunk["student_id"])
+            for name, column in chunk.items():
+                files[name][offset:offset + size] = column
+            offset += size
+        if offset != n:
+            raise ValueError(f"청크 합계({offset})가 지정한 인원({n})과 다릅니다")
+
+        # 내용 해시: 컬럼 순서대로 (이름, dtype, 바이트)를 이어 붙인 sha256
+        h = hashlib.sha256(f"v{STORE_VERSION}".encode())
+        for name, column in files.items():
+            column.flush()
+            h.update(name.encode())
+            h.update(str(column.dtype).encode())
+            for start in range(0, n, IMPORT_CHUNK * 16):
+                h.update(np.ascontiguousarray(column[start:start + IMPORT_CHUNK * 16]).tobytes())
+        h.update(json.dumps(vocab, sort_keys=True, ensure_ascii=False).encode())
+        del files
+
+        meta = {
+            "version": STORE_VERSION,
+            "n_users": int(n),
+            "n_total": int(n if n_total is None else n_total),
+            "fields": {name: str(np.dtype(dtype)) for name, dtype in dtypes.items()},
+            "vocab": vocab,
+            "sha256": h.hexdigest(),
+            "source": source,
+            "source_sha256": fingerprint(source) if source and os.path.isfile(source) else None,
+            "created_at": datetime.now().isoformat(),
+        }
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        if os.path.exists(out):
+            shutil.rmtree(out)
+        os.rename(tmp, out)
+    except Exception:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return meta
+
+
+def import_user_store(src, out, required):
+    """JSON/JSONL 파일을 읽어 컬럼형 저장소로 씁니다 (원본 해시를 meta에 기록)"""
+    columns, vocab, n_total = import_records(src, required)
+    return write_user_store(out, columns, vocab, n_total, source=src)
+
+
+def refresh_user_store(path, required):
+    """원본 파일이 저장소를 만든 뒤 바뀌었으면 저장소를 다시 만듭니다. 다시 만들었으면 True"""
+    if not is_stale_store(path):
+        return False
+    source = read_meta(path)["source"]
+    start = time.perf_counter()
+    meta = import_user_store(source, path, required)
+    print(f"🔄 원본이 바뀌어 유저 저장소를 다시 만들었습니다 ({meta['n_users']}명, {time.perf_counter() - start:.1f}초): {source} -> {path}")
+    return True
+
+
+def load_user_store(path, mmap=True):
+    """(컬럼 dict, 카테고리 사전, meta). mmap=True면 배열을 메모리 매핑으로 엽니다"""
+    meta = read_meta(path)
+    if meta.get("version") != STORE_VERSION:
+        raise ValueError(f"지원하지 않는 저장소 버전: {meta.get('version')}")
+    columns = {
+        name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r" if mmap else None)
+        for name in meta["fields"]
+    }
+    return columns, meta["vocab"], meta
+
+
+def to_frame_columns(columns, vocab, names=None):
+    """저장소 컬럼을 DataFrame용 배열로 변환합니다 (id/category는 object 문자열)"""
+    out = {}
+    for name in names or columns:
+        column = columns[name]
+        if name in vocab:
+            out[name] = np.array(vocab[name], dtype=object)[np.asarray(column)]
+        elif column.dtype.kind == "S":
+            out[name] = np.char.decode(column, "ascii").astype(object)
+        elif column.dtype.kind == "U":
+            out[name] = column.astype(object)
+        else:
+            out[name] = np.asarray(column)
+    return out
+
+
+def read_users(path, required):
+    """저장소 또는 JSON/JSONL 파일 -> (DataFrame용 컬럼 dict, 전체 레코드 수, 유효 레코드 수)"""
+    if is_user_store(path):
+        columns, vocab, meta = load_user_store(path)
+        missing = [field for field in required if field not in columns]
+        if missing:
+            raise ValueError(f"저장소에 필수 필드가 없습니다: {missing}")
+        return to_frame_columns(columns, vocab), meta["n_total"], meta["n_users"]
+    columns, vocab, n_total = import_records(path, required)
+    return to_frame_columns(columns, vocab), n_total, len(columns["student_id"])
+
+
+# ======================
+# 벤치마크
+# ======================
+def max_rss_mb():
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def write_synthetic_jsonl(path, template_path, n, seed=42):
+    """원본 레코드를 무작위로 다시 뽑아 학번만 새로 붙인 n명짜리 JSONL을 만듭니다"""
+    records = list(iter_records(template_path))
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(records), n)
+    with open(path, "w", encoding="utf-8") as f:
+        for i, pick in enumerate(picks.tolist()):
+            record = dict(records[pick], student_id=f"9{i:09d}")
+            f.write(json.dumps(record, ensure_ascii=False))
+            f.write("\n")
+
+
+def measure_load(path, mode, required):
+    """한 가지 방식으로 유저를 읽어 DataFrame을 만들고 (초, 최대 RSS MB)를 반환합니다"""
+    import pandas as pd
+    start = time.perf_counter()
+    if mode == "json":
+        # 기존 부팅 경로: json.load + 필수 필드 검사 루프 + DataFrame
+        records = [json.loads(line) for line in open(path, encoding="utf-8")] if path.endswith(".jsonl") else json.load(open(path, encoding="utf-8"))
+        valid = [record for record in records if all(field in record for field in required)]
+        df = pd.DataFrame(valid)
+    else:
+        columns, _, _ = read_users(path, required)
+        df = pd.DataFrame(columns)
+    return {"mode": mode, "n_users": len(df), "seconds": round(time.perf_counter() - start, 3), "max_rss_mb": round(max_rss_mb(), 1)}
+
+
+def run_benchmark(template_path, n, workdir, required):
+    os.makedirs(workdir, exist_ok=True)
+    jsonl = os.path.join(workdir, f"users_{n}.jsonl")
+    store = os.path.join(workdir, f"users_{n}.store")
+
+    start = time.perf_counter()
+    write_synthetic_jsonl(jsonl, template_path, n)
+    print(f"▶ 합성 JSONL 생성: {time.perf_counter() - start:.1f}초 ({os.path.getsize(jsonl) / 1e6:.0f}MB)")
+
+    start = time.perf_counter()
+    columns, vocab, n_total = import_records(jsonl, required)
+    write_user_store(store, columns, vocab, n_total, source=jsonl)
+    import_sec = time.perf_counter() - start
+    store_mb = sum(os.path.getsize(os.path.join(store, name)) for name in os.listdir(store)) / 1e6
+
+    rows = []
+    for mode, path in (("json", jsonl), ("store", store)):
+        # 최대 RSS를 따로 재기 위해 방식마다 새 프로세스에서 측정
+        out = subprocess.run(
+            [sys.executable, "-m", "code.user_store", "measure", path, "--mode", mode, "--required", *required],
+            check=True, capture_output=True, text=True
+        )
+        rows.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {
+        "n_users": n,
+        "jsonl_mb": round(os.path.getsize(jsonl) / 1e6, 1),
+        "store_mb": round(store_mb, 1),
+        "import_seconds": round(import_sec, 3),
+        "load": rows,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="컬럼형 유저 저장소 변환/벤치마크")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_import = sub.add_parser("import", help="JSON/JSONL -> 컬럼형 저장소")
+    p_import.add_argument("src")
+    p_import.add_argument("out", nargs="?", default=USER_STORE_PATH)
+
+    p_bench = sub.add_parser("bench", help="JSON 대비 저장소 로드 시간 / 메모리 측정")
+    p_bench.add_argument("--template", default="data/dormitory_users.json")
+    p_bench.add_argument("--n", type=int, default=1_000_000)
+    p_bench.add_argument("--workdir", default=None)
+
+    p_measure = sub.add_parser("measure")
+    p_measure.add_argument("path")
+    p_measure.add_argument("--mode", choices=["json", "store"], required=True)
+    p_measure.add_argument("--required", nargs="+", default=["student_id", "gender"])
+    args = parser.parse_args()
+
+    from .main import weight_A
+
+    required = ["student_id", "gender"] + list(weight_A)
+    if args.command == "import":
+        start = time.perf_counter()
+        meta = import_user_store(args.src, args.out, required)
+        print(f"✅ {meta['n_total']}개 중 {meta['n_users']}개 저장 ({time.perf_counter() - start:.1f}초): {args.out}")
+    elif args.command == "measure":
+        print(json.dumps(measure_load(args.path, args.mode, args.required)))
+    else:
+        workdir = args.workdir or tempfile.mkdtemp(prefix="user-store-bench-")
+        print(json.dumps(run_benchmark(args.template, args.n, workdir, required), ensure_ascii=False, indent=2))
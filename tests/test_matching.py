@@ -0,0 +1,122 @@
+import json
+
+import numpy as np
+import pytest
+
+from code import main
+from code.main import DormMatchAI_Server
+
+DATA_PATH = "data/dormitory_users.json"
+N_TARGETS = 200
+
+
+# ======================
+# 공용 fixture
+# ======================
+@pytest.fixture(scope="module")
+def users():
+    with open(DATA_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="module")
+def targets(users):
+    return users[:N_TARGETS]
+
+
+def train_engine(scoring, artifact_dir=None):
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(main, "MATCH_SCORING", scoring)
+        engine = DormMatchAI_Server(DATA_PATH)
+        engine.load_and_train(artifact_dir=artifact_dir)
+    return engine
+
+
+@pytest.fixture(scope="module")
+def packed_engine():
+    engine = train_engine("packed")
+    assert engine.packer is not None
+    return engine
+
+
+@pytest.fixture(scope="module")
+def float_engine():
+    engine = train_engine("float")
+    assert engine.packer is None
+    return engine
+
+
+def ranking(results):
+    return [(r["student_id"], r["match_rate"]) for r in results]
+
+
+def same_up_to_ties(results, expected):
+    """점수는 같고, 학번은 같은 점수끼리 묶었을 때 같으면 True (페이지 경계에 걸친 첫/마지막 묶음은 크기만 비교)"""
+    rates = [r["match_rate"] for r in results]
+    if rates != [r["match_rate"] for r in expected]:
+        return False
+    inner = set(rates) - {rates[0], rates[-1]} if rates else set()
+    return all(
+        {r["student_id"] for r in results if r["match_rate"] == rate} == {r["student_id"] for r in expected if r["match_rate"] == rate}
+        for rate in inner
+    )
+
+
+# ======================
+# 채점 / 추천
+# ======================
+@pytest.mark.parametrize("count,page", [(5, 1), (10, 3)])
+def test_packed_matches_float_top_k(packed_engine, float_engine, targets, count, page):
+    # float32 채점은 합산 오차로 동점이 미세하게 갈라지므로 같은 점수 안의 순서는 비교하지 않음
+    for user in targets:
+        packed = packed_engine.recommend(user, count=count, page=page)
+        expected = float_engine.recommend(user, count=count, page=page)
+        assert len(packed) == count
+        assert same_up_to_ties(packed, expected), user["student_id"]
+
+
+@pytest.mark.parametrize("strict", [False, True])
+def test_batch_matches_single(packed_engine, targets, strict):
+    # 패킹 채점은 점수가 정확해 동점 순서(UserTable 위치)까지 같아야 함
+    batch = packed_engine.recommend_batch(targets, count=5, page=2, strict=strict)
+    assert [row["student_id"] for row in batch] == [user["student_id"] for user in targets]
+    for user, row in zip(targets, batch):
+        single = packed_engine.recommend(user, count=5, page=2, strict=strict)
+        assert ranking(row["recommendations"]) == ranking(single), user["student_id"]
+
+
+def test_strict_has_no_smoker_drinker_violations(packed_engine, users, targets):
+    by_id = {user["student_id"]: user for user in users}
+    checked = 0
+    for user in targets:
+        for rec in packed_engine.recommend(user, count=20, strict=True):
+            mate = by_id[rec["student_id"]]
+            assert mate["gender"] == user["gender"]
+            for a, b in ((user, mate), (mate, user)):
+                assert b["wants_smoker"] or not a["is_smoker"], (user["student_id"], mate["student_id"])
+                assert b["wants_drinker"] or not a["is_drinker"], (user["student_id"], mate["student_id"])
+            checked += 1
+    assert checked > 0
+
+
+# ======================
+# 아티팩트
+# ======================
+def test_artifact_round_trip(tmp_path, targets, monkeypatch):
+    trained = train_engine("packed", artifact_dir=str(tmp_path))
+    assert list(tmp_path.iterdir())
+
+    # 두 번째 로드는 저장된 아티팩트를 써야 하므로 학습하면 실패
+    def no_training(self, weighted_data):
+        raise AssertionError("아티팩트가 있는데 다시 학습했습니다")
+    monkeypatch.setattr(DormMatchAI_Server, "fit_clusters", no_training)
+    restored = train_engine("packed", artifact_dir=str(tmp_path))
+
+    assert restored.artifact_key == trained.artifact_key
+    assert restored.cluster_selection == trained.cluster_selection
+    np.testing.assert_array_equal(restored.centroids, trained.centroids)
+    np.testing.assert_array_equal(restored.users['cluster_id'], trained.users['cluster_id'])
+    np.testing.assert_allclose(restored.users['weighted'], trained.users['weighted'])
+    np.testing.assert_allclose(restored.scaler.scale_, trained.scaler.scale_)
+    for user in targets:
+        assert ranking(restored.recommend(user)) == ranking(trained.recommend(user)), user["student_id"]